@@ -0,0 +1,320 @@
+# Circle and Person in 3.py keep their state in a per-instance __dict__ and validate it through @property setters.
+# That is perfect for a few objects, but every instance carries a whole dict on top of the object itself,
+# and with millions of small objects the dicts are most of the memory.
+# Two ways to make them compact:
+# __slots__: the class declares its attributes up front, and instances store them in fixed slots with no __dict__.
+# Columnar containers: instead of a million objects, keep one contiguous buffer per attribute (all radii in one array,
+# all names in one byte buffer), and compute properties like area for every element at once.
+
+# Example: __slots__ and array-backed compact representations
+import math
+import operator
+import time
+import tracemalloc
+from array import array
+
+import numpy as np
+
+
+# The classes from 3.py, for comparison
+class Circle:
+    def __init__(self, radius):
+        self._radius = radius
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @radius.setter
+    def radius(self, value):
+        if value < 0:
+            raise ValueError("Radius cannot be negative")
+        self._radius = value
+
+    @property
+    def area(self):
+        return 3.1416 * (self._radius ** 2)
+
+
+class Person:
+    def __init__(self, name):
+        self._name = name
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        if not isinstance(value, str):
+            raise ValueError("Name must be a string")
+        self._name = value
+
+    @name.deleter
+    def name(self):
+        del self._name
+
+
+# 1. Slotted variants: same interface, same validation, no per-instance __dict__
+class SlottedCircle:
+    __slots__ = ("_radius",)
+
+    def __init__(self, radius):
+        self.radius = radius  # Goes through the setter, so the constructor validates too
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @radius.setter
+    def radius(self, value):
+        if not value >= 0:  # Also rejects NaN, which compares False with everything
+            raise ValueError("Radius cannot be negative or NaN")
+        self._radius = value
+
+    @property
+    def area(self):
+        return 3.1416 * (self._radius ** 2)
+
+
+class SlottedPerson:
+    __slots__ = ("_name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        if not isinstance(value, str):
+            raise ValueError("Name must be a string")
+        self._name = value
+
+    @name.deleter
+    def name(self):
+        del self._name
+
+
+# 2. Columnar containers
+class CircleArray:
+    """Many circles as one contiguous float64 buffer of radii."""
+
+    def __init__(self, radii=()):
+        self._radii = np.array(radii, dtype=np.float64)
+        self._validate(self._radii)
+
+    @staticmethod
+    def _validate(values):
+        if not np.all(values >= 0):  # One vectorized check for the whole batch (NaN fails it too)
+            raise ValueError("Radius cannot be negative or NaN")
+
+    @property
+    def radius(self):
+        view = self._radii.view()
+        view.flags.writeable = False  # Writes must go through __setitem__ / the setter, which validate
+        return view
+
+    @radius.setter
+    def radius(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self._validate(values)
+        self._radii = np.array(np.broadcast_to(values, self._radii.shape))
+
+    @property
+    def area(self):
+        """All areas at once, computed in C."""
+        return 3.1416 * self._radii ** 2
+
+    def __len__(self):
+        return len(self._radii)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CircleArray(self._radii[index])
+        return SlottedCircle(float(self._radii[index]))  # A single element comes back as a small object
+
+    def __setitem__(self, index, values):
+        values = np.asarray(values, dtype=np.float64)
+        self._validate(values)
+        self._radii[index] = values
+
+    def append(self, radius):
+        self._validate(np.asarray(radius))
+        self._radii = np.append(self._radii, radius)  # Amortize by building from a list or extend() in bulk
+
+    def extend(self, radii):
+        radii = np.asarray(radii, dtype=np.float64)
+        self._validate(radii)
+        self._radii = np.concatenate([self._radii, radii])
+
+    @property
+    def nbytes(self):
+        return self._radii.nbytes
+
+
+class PersonTable:
+    """Many names as one UTF-8 byte buffer plus an array of end offsets."""
+
+    def __init__(self, names=()):
+        self._data = bytearray()
+        self._ends = array("Q")
+        self.extend(names)
+
+    @staticmethod
+    def _validate(names):
+        if not all(isinstance(name, str) for name in names):
+            raise ValueError("Name must be a string")
+
+    def extend(self, names):
+        names = list(names)
+        self._validate(names)  # Validate the whole batch before changing anything
+        end = self._ends[-1] if self._ends else 0
+        for name in names:
+            encoded = name.encode()
+            self._data += encoded
+            end += len(encoded)
+            self._ends.append(end)
+
+    def append(self, name):
+        self.extend([name])
+
+    def __len__(self):
+        return len(self._ends)
+
+    def _position(self, index):
+        index = operator.index(index)
+        if index < 0:
+            index += len(self._ends)
+        if not 0 <= index < len(self._ends):
+            raise IndexError("PersonTable index out of range")
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PersonTable(self[i] for i in range(*index.indices(len(self._ends))))
+        index = self._position(index)
+        start = self._ends[index - 1] if index else 0
+        return self._data[start:self._ends[index]].decode()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            values = list(value)
+            self._validate(values)  # The whole batch, before anything changes
+            names = list(self)
+            names[index] = values
+            self._data, self._ends = bytearray(), array("Q")
+            self.extend(names)
+            return
+        self._validate([value])
+        index = self._position(index)
+        start, end = (self._ends[index - 1] if index else 0), self._ends[index]
+        encoded = value.encode()
+        self._data[start:end] = encoded
+        ends = np.frombuffer(self._ends, dtype=np.int64)  # Shift every later offset in one vectorized add
+        ends[index:] += len(encoded) - (end - start)
+        del ends
+
+    def __iter__(self):
+        data, start = self._data, 0
+        for end in self._ends:
+            yield data[start:end].decode()
+            start = end
+
+    @property
+    def name_lengths(self):
+        """Vectorized computed property: the byte length of every name."""
+        ends = np.frombuffer(self._ends, dtype=np.uint64).astype(np.int64)
+        return np.diff(ends, prepend=0)
+
+    @property
+    def nbytes(self):
+        return len(self._data) + self._ends.itemsize * len(self._ends)
+
+
+def traced_bytes(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+if __name__ == "__main__":
+    n = 1_000_000
+    radii = [i % 100 + 0.5 for i in range(n)]
+    names = [f"person-{i}" for i in range(n)]
+
+    circles, dict_size = traced_bytes(lambda: [Circle(r) for r in radii])
+    slotted, slot_size = traced_bytes(lambda: [SlottedCircle(r) for r in radii])
+    columnar, column_size = traced_bytes(lambda: CircleArray(radii))
+    print(f"Circle        {dict_size / n:6.1f} bytes/object")
+    print(f"SlottedCircle {slot_size / n:6.1f} bytes/object")
+    print(f"CircleArray   {column_size / n:6.1f} bytes/object")
+
+    people, people_size = traced_bytes(lambda: [Person(name) for name in names])
+    slotted_people, slotted_people_size = traced_bytes(lambda: [SlottedPerson(name) for name in names])
+    table, table_size = traced_bytes(lambda: PersonTable(names))
+    print(f"Person        {people_size / n:6.1f} bytes/object (plus the name strings)")
+    print(f"SlottedPerson {slotted_people_size / n:6.1f} bytes/object (plus the name strings)")
+    print(f"PersonTable   {table_size / n:6.1f} bytes/object (names included)")
+
+    for label, total_area in (("sum(c.area) over Circle", lambda: sum(c.area for c in circles)),
+                              ("sum(c.area) over SlottedCircle", lambda: sum(c.area for c in slotted)),
+                              ("CircleArray.area.sum()", lambda: columnar.area.sum())):
+        start = time.perf_counter()
+        total = total_area()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<32} {n / elapsed / 1e6:8.1f} M areas/s  (total {total:.6g})")
+
+    assert math.isclose(sum(c.area for c in circles), columnar.area.sum())
+    print(table[42], columnar[3].area, columnar[1:4].area)
+    try:
+        columnar[10:20] = [1.0] * 9 + [-1.0]  # Bulk validation: the whole assignment is rejected
+    except ValueError as exc:
+        print("ValueError:", exc)
+    table[42] = "Ada Lovelace"
+    print(table[42], table[-1], list(table[40:44]))
+    try:
+        table[0:3] = ["Alan", "Grace", None]  # Bulk validation again: nothing is replaced
+    except ValueError as exc:
+        print("ValueError:", exc, "-", table[0])
+    try:
+        table[-n - 1]
+    except IndexError as exc:
+        print("IndexError:", exc)
+    try:
+        SlottedCircle(1).color = "red"  # No __dict__, so unknown attributes are rejected
+    except AttributeError as exc:
+        print("AttributeError:", exc)
+
+# Explanation:
+# SlottedCircle and SlottedPerson are the 3.py classes with __slots__: the same properties and validation, but the
+# instance stores its one attribute in a slot instead of a dict, which removes the dict from every object.
+# CircleArray stores all radii in one NumPy float64 buffer (8 bytes per circle). area returns every area at once,
+# computed in a single C loop, and every assignment is validated in bulk with one vectorized comparison.
+# PersonTable stores all names in one UTF-8 bytearray plus an array of end offsets, so a name costs its bytes
+# plus 8, instead of a str object (~50 bytes + the text) and a Person object around it. Indexing checks the range like
+# a list, slicing returns a new PersonTable, and assignment validates every new name before the buffer changes.
+# Output (numbers depend on the Python version and the machine):
+# Circle          88.5 bytes/object
+# SlottedCircle   48.4 bytes/object
+# CircleArray      8.0 bytes/object
+# Person          88.5 bytes/object (plus the name strings)
+# SlottedPerson   48.4 bytes/object (plus the name strings)
+# PersonTable     22.3 bytes/object (names included)
+# sum(c.area) over Circle               8.1 M areas/s  (total 1.04717e+10)
+# sum(c.area) over SlottedCircle        6.7 M areas/s  (total 1.04717e+10)
+# CircleArray.area.sum()              335.3 M areas/s  (total 1.04717e+10)
+# person-42 38.4846 [ 7.0686 19.635  38.4846]
+# ValueError: Radius cannot be negative or NaN
+# Ada Lovelace person-999999 ['person-40', 'person-41', 'Ada Lovelace', 'person-43']
+# ValueError: Name must be a string - person-0
+# IndexError: PersonTable index out of range
+# AttributeError: 'SlottedCircle' object has no attribute 'color'
+# (Per-object sizes include the list slot holding each object; the floats and strs are shared with the input lists.)
+# Key Points:
+# Use __slots__ when you need real objects; use a columnar container when you process the elements in bulk.
+# Columnar containers hand out a small object (or a read-only view) per element, so callers can't bypass validation.
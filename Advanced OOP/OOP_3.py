@@ -0,0 +1,305 @@
+# 1.py defines the Animal, Movable and Flyable ABCs and 2.py shows how Python walks the MRO of a diamond like D(B, C).
+# With a handful of classes both are cheap, but a plugin system with hundreds of implementations asks the same
+# questions again and again: "is this object Flyable?" (isinstance against an ABC, which goes through the abc module's
+# subclass caches and is recomputed whenever any ABC gets a new registration) and "which method runs for fly?"
+# (getattr through a deep MRO). "Which classes can fly?" is worse: nothing answers it without scanning every class.
+# An interface registry answers all three from tables built once per concrete class:
+# a method table (interface method name -> the function the MRO resolves to), the set of interfaces it implements,
+# and a reverse index from every capability to the classes that have it.
+
+# Example: An interface registry with cached method tables
+import abc
+import inspect
+import time
+import types
+from abc import ABC, abstractmethod
+
+
+# The interfaces from 1.py
+class Animal(ABC):
+    @abstractmethod
+    def sound(self):
+        pass
+
+    def eat(self):
+        return "This animal is eating"
+
+
+class Movable(ABC):
+    @abstractmethod
+    def move(self):
+        pass
+
+
+class Flyable(ABC):
+    @abstractmethod
+    def fly(self):
+        pass
+
+
+def _table_entry(attr):
+    """A method table entry called as entry(obj, *args): plain functions as they are, other attributes bound per call.
+
+    getattr(cls, name) would already have bound a classmethod to cls and unwrapped a staticmethod, and calling the
+    result with obj prepended passes one argument too many; binding with __get__(obj, type(obj)) does what obj.name does.
+    """
+    if isinstance(attr, types.FunctionType):
+        return attr
+    get = getattr(type(attr), "__get__", None)
+    if get is None:  # Not a descriptor: a callable stored on the class is called as it is
+        return lambda obj, *args, **kwargs: attr(*args, **kwargs)
+    return lambda obj, *args, **kwargs: get(attr, obj, type(obj))(*args, **kwargs)
+
+
+class InterfaceRegistry:
+    """Precomputed method tables and capability indexes for registered interfaces and implementation classes."""
+
+    def __init__(self):
+        self._interfaces = {}     # Interface -> the method names it requires
+        self._classes = set()     # Explicitly registered implementation classes
+        self._tables = {}         # Class -> {method name: function}
+        self._implements = {}     # Class -> frozenset of interfaces
+        self._by_interface = {}   # Interface -> set of registered classes
+        self._by_capability = {}  # Method name -> set of registered classes
+        self._abc_token = abc.get_cache_token()
+
+    def interface(self, iface):
+        """Register an interface (an ABC). Usable as a class decorator. Existing tables are rebuilt."""
+        self._interfaces[iface] = frozenset(iface.__abstractmethods__)
+        self._rebuild()
+        return iface
+
+    def register(self, cls):
+        """Register an implementation class. Usable as a class decorator."""
+        self._check_token()
+        self._classes.add(cls)
+        self._index(cls)
+        return cls
+
+    def unregister(self, cls):
+        self._classes.discard(cls)
+        self._drop(cls)
+
+    def invalidate(self, cls=None):
+        """Forget the cached tables of `cls` (all classes by default), e.g. after patching methods onto it."""
+        if cls is None:
+            self._rebuild()
+        elif cls in self._classes:
+            self._drop(cls)
+            self._index(cls)
+        else:
+            self._drop(cls)
+
+    def _rebuild(self):
+        self._tables.clear()
+        self._implements.clear()
+        self._by_interface = {iface: set() for iface in self._interfaces}
+        self._by_capability = {}
+        self._abc_token = abc.get_cache_token()
+        for cls in self._classes:
+            self._index(cls)
+
+    def _drop(self, cls):
+        self._tables.pop(cls, None)
+        for iface in self._implements.pop(cls, ()):
+            # Tables built lazily by implements() may never have been indexed: nothing to discard there
+            self._by_interface.get(iface, set()).discard(cls)
+            for name in self._interfaces[iface]:
+                self._by_capability.get(name, set()).discard(cls)
+
+    def _build(self, cls):
+        """Walk the MRO once: which interfaces cls implements and which function each of their methods resolves to."""
+        implements = frozenset(iface for iface in self._interfaces if issubclass(cls, iface))
+        table = {}
+        for iface in implements:
+            for name in self._interfaces[iface]:
+                table[name] = _table_entry(inspect.getattr_static(cls, name))  # The raw attribute the MRO finds
+        self._tables[cls] = table
+        self._implements[cls] = implements
+        return table
+
+    def _index(self, cls):
+        self._drop(cls)
+        self._build(cls)
+        for iface in self._implements[cls]:
+            self._by_interface[iface].add(cls)
+            for name in self._interfaces[iface]:
+                self._by_capability.setdefault(name, set()).add(cls)
+
+    def _check_token(self):
+        # ABC.register() (a "virtual" subclass) changes the abc cache token: our negative answers may be stale then
+        if abc.get_cache_token() != self._abc_token:
+            self._rebuild()
+
+    def table(self, cls):
+        """The method table of cls; unregistered classes (e.g. a subclass created later) are built on first use."""
+        try:
+            return self._tables[cls]
+        except KeyError:
+            self._check_token()
+            return self._tables[cls] if cls in self._tables else self._build(cls)
+
+    def implements(self, obj, iface):
+        """The cached equivalent of isinstance(obj, iface) for a registered interface."""
+        try:
+            if iface in self._implements[type(obj)]:
+                return True
+        except KeyError:
+            self.table(type(obj))
+            return iface in self._implements[type(obj)]
+        if abc.get_cache_token() != self._abc_token:  # Only a negative answer can go stale
+            self._rebuild()
+            self.table(type(obj))
+            return iface in self._implements[type(obj)]
+        return False
+
+    def dispatch(self, obj, name, *args, **kwargs):
+        """Call obj.<name>(...) through the cached method table."""
+        try:
+            method = self._tables[type(obj)][name]
+        except KeyError:
+            method = self.table(type(obj))[name]
+        return method(obj, *args, **kwargs)
+
+    def classes_that(self, capability):
+        """Every registered class that can `capability` (a method name of a registered interface)."""
+        return frozenset(self._by_capability.get(capability, ()))
+
+    def implementations(self, iface):
+        return frozenset(self._by_interface.get(iface, ()))
+
+
+# A plugin system in the style of 2.py: deep diamond hierarchies of mixins over the 1.py interfaces
+def make_plugins(count, depth=12):
+    plugins = []
+    for i in range(count):
+        bases = (Animal, Movable, Flyable) if i % 3 == 0 else (Animal, Movable)
+        namespace = {"sound": lambda self, i=i: f"sound {i}", "move": lambda self: "moving"}
+        if i % 3 == 0:
+            namespace["fly"] = lambda self: "flying"
+        cls = type(f"Base{i}", bases, namespace)
+        for level in range(depth):  # Each level is a small diamond: Left(cls), Right(cls), Level(Left, Right)
+            left = type(f"Left{i}_{level}", (cls,), {})
+            right = type(f"Right{i}_{level}", (cls,), {})
+            cls = type(f"Plugin{i}_{level}", (left, right), {})
+        plugins.append(cls)
+    return plugins
+
+
+def rate(label, func, n):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<52} {elapsed / n * 1e9:8.0f} ns/op")
+
+
+if __name__ == "__main__":
+    registry = InterfaceRegistry()
+    for iface in (Animal, Movable, Flyable):
+        registry.interface(iface)
+
+    @registry.register
+    class Bird(Animal, Movable, Flyable):
+        def sound(self):
+            return "Tweet"
+
+        def move(self):
+            return "Bird is moving"
+
+        def fly(self):
+            return "Bird is flying"
+
+    @registry.register
+    class Dog(Animal):
+        def sound(self):
+            return "Bark"
+
+    print(registry.dispatch(Bird(), "fly"), registry.dispatch(Dog(), "sound"))
+    print("can fly:", sorted(cls.__name__ for cls in registry.classes_that("fly")))
+
+    # Late registration: a class that becomes Movable after the tables were built (virtual subclass)
+    class Robot:
+        def move(self):
+            return "Robot is rolling"
+
+    registry.register(Robot)
+    print("Robot movable before:", registry.implements(Robot(), Movable))
+    Movable.register(Robot)
+    print("Robot movable after: ", registry.implements(Robot(), Movable),
+          sorted(cls.__name__ for cls in registry.classes_that("move")))
+
+    plugins = make_plugins(300)
+    for cls in plugins:
+        registry.register(cls)
+    objects = [cls() for cls in plugins] * 20
+    n = len(objects)
+    print(f"{len(plugins)} plugin classes, MRO length {len(plugins[0].__mro__)}, {n} calls per benchmark")
+
+    def abc_dispatch():
+        for obj in objects:
+            if isinstance(obj, Flyable):
+                getattr(obj, "fly")()
+
+    def registry_dispatch():
+        for obj in objects:
+            if registry.implements(obj, Flyable):
+                registry.dispatch(obj, "fly")
+
+    def registry_tables():
+        tables = registry._tables  # A hot loop can hoist the table lookup
+        for obj in objects:
+            fly = tables[type(obj)].get("fly")
+            if fly is not None:
+                fly(obj)
+
+    rate("isinstance(ABC) + getattr", abc_dispatch, n)
+    rate("registry.implements + registry.dispatch", registry_dispatch, n)
+    rate("registry method table", registry_tables, n)
+
+    # Every ABC.register() anywhere resets the negative answers of every ABC: the next pass pays for them once
+    for label, dispatch in (("isinstance(ABC) + getattr", abc_dispatch), ("registry (tables rebuilt)", registry_dispatch)):
+        Movable.register(type("Late", (), {}))
+        start = time.perf_counter()
+        dispatch()
+        print(f"first pass after ABC.register, {label:<26} {(time.perf_counter() - start) * 1e3:8.0f} ms")
+
+    candidates = [Bird, Dog, Robot, *plugins]
+    start = time.perf_counter()
+    for _ in range(1000):
+        flyers = [cls for cls in candidates if issubclass(cls, Flyable)]
+    print(f"{'which classes can fly: scan with issubclass':<52} {(time.perf_counter() - start) * 1e3:8.0f} µs/query"
+          f"  ({len(flyers)} classes)")
+    start = time.perf_counter()
+    for _ in range(1000):
+        flyers = registry.classes_that("fly")
+    print(f"{'which classes can fly: registry.classes_that':<52} {(time.perf_counter() - start) * 1e3:8.1f} µs/query"
+          f"  ({len(flyers)} classes)")
+
+# Explanation:
+# registry.interface(Flyable) records the abstract methods of the interface. registry.register(cls) walks the MRO
+# of cls once: it asks issubclass() for every interface (so ABC.register() "virtual" subclasses count too) and stores
+# the function each interface method resolves to, plus reverse indexes interface -> classes and method -> classes.
+# Plain functions are stored as they are; a staticmethod, classmethod or property is stored with a small wrapper that
+# binds it to the object on each call, exactly as obj.method would.
+# implements() and dispatch() are then two dict lookups, and classes_that("fly") returns a precomputed set.
+# Invalidation: registering a new interface rebuilds every table; registering a class indexes just that class; and
+# every ABC.register() changes abc.get_cache_token(), which the registry checks before trusting a negative answer,
+# so a class that becomes Movable later (Robot) is picked up. invalidate(cls) covers methods patched onto a class.
+# Output (numbers depend on the machine):
+# Bird is flying Bark
+# can fly: ['Bird']
+# Robot movable before: False
+# Robot movable after:  True ['Bird', 'Robot']
+# 300 plugin classes, MRO length 42, 6000 calls per benchmark
+# isinstance(ABC) + getattr                                1103 ns/op
+# registry.implements + registry.dispatch                   429 ns/op
+# registry method table                                     127 ns/op
+# first pass after ABC.register, isinstance(ABC) + getattr      4467 ms
+# first pass after ABC.register, registry (tables rebuilt)      4460 ms
+# which classes can fly: scan with issubclass               111 µs/query  (101 classes)
+# which classes can fly: registry.classes_that              1.7 µs/query  (101 classes)
+# A negative isinstance() against an ABC walks every subclass of the ABC (3,600 here), so the first pass after any
+# ABC.register() is slow. The registry pays the same price once when it rebuilds and is then back to two dict lookups.
+# Key Points:
+# Cache per class, not per object: there are hundreds of classes but millions of calls.
+# Register plugins at startup, before the hot path; late registrations are correct but trigger a rebuild.
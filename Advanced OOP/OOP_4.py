@@ -0,0 +1,125 @@
+# Every example module in this repository does its work at import time: 1.py calls dog.sound(), 5.py sends requests,
+# the concurrency examples start threads and processes, and `import requests` sits at the top of every file that
+# might need it. Importing any of them is slow and has side effects.
+# A plugin package avoids both:
+# The package only knows plugin *names* ("dog" -> "animals.pets:Dog"), and imports a module on the first lookup.
+# Installed packages add plugins through an entry point group, scanned only when a name isn't built in.
+# Heavy dependencies (requests, multiprocessing, asyncio) are imported inside the functions that need them.
+# python -X importtime prints the cost of every import, which makes startup time measurable and testable.
+
+# Example: Lazy plugin discovery and deferred imports (see the animals/ package next to this file)
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 15))  # Cold `import animals`, on top of the interpreter
+HEAVY = ("requests", "multiprocessing", "asyncio", "concurrent.futures", "importlib.metadata")
+
+
+def import_time(statement, repeat=5):
+    """Best-of-`repeat` import time (ms) of `statement` in a fresh interpreter, and its slowest top-level imports.
+
+    Modules the interpreter imports on its own (site, encodings, ...) are left out: they are paid by every script.
+    """
+    def run(code):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=HERE,
+                                capture_output=True, text=True, check=True)
+        modules = []
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "self [us]" not in line:
+                self_us, cumulative_us, name = line[len("import time:"):].split("|")
+                modules.append((name.strip(), not name.startswith("  "), int(self_us), int(cumulative_us)))
+        return modules
+
+    startup = {name for name, *_ in run("pass")}
+    best, top = None, []
+    for _ in range(repeat):
+        modules = [module for module in run(statement) if module[0] not in startup]
+        total = sum(self_us for _, _, self_us, _ in modules) / 1000
+        if best is None or total < best:
+            # Indentation marks nested imports: report only the top-level ones
+            best, top = total, sorted(((cumulative_us, name) for name, top_level, _, cumulative_us in modules
+                                       if top_level), reverse=True)
+    return best, top
+
+
+def modules_after(statement):
+    """Which of the HEAVY modules a fresh interpreter has loaded after `statement`."""
+    code = f"{statement}\nimport sys\nprint(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True).stdout
+    return [name for name in output.strip().split(",") if name]
+
+
+EAGER = "import requests, multiprocessing, asyncio, animals.pets, animals.birds, animals.remote"  # The old shape
+LAZY = "import animals"
+
+
+def check_budget():
+    """Exit non-zero when `import animals` is over budget or pulls in a heavy module: run it in CI."""
+    elapsed, top = import_time(LAZY)
+    heavy = modules_after(LAZY)
+    print(f"import animals: {elapsed:.1f} ms (budget {STARTUP_BUDGET_MS:.0f} ms), heavy modules: {heavy or 'none'}")
+    if elapsed > STARTUP_BUDGET_MS or heavy:
+        for cumulative_us, name in top[:5]:
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv:
+        check_budget()
+        sys.exit(0)
+
+    import animals
+
+    print(animals.names())                      # Scans entry points; still imports no plugin module
+    print("pets loaded:", "animals.pets" in sys.modules)
+    print(animals.create("dog").sound())         # Imports animals.pets now
+    from animals import Bird                     # PEP 562 module __getattr__: imports animals.birds now
+    print(Bird().fly())
+    animals.register("robot", "animals.pets:Cat")
+    print(animals.load("robot")().sound())
+    try:
+        animals.load("unicorn")
+    except LookupError as exc:
+        print("LookupError:", exc)
+
+    for label, statement in (("eager (imports at the top)", EAGER), ("lazy (import animals)", LAZY),
+                             ("lazy + first plugin", "import animals; animals.load('dog')")):
+        elapsed, top = import_time(statement)
+        print(f"{label:<28} {elapsed:7.1f} ms  heavy modules loaded: {', '.join(modules_after(statement)) or 'none'}")
+    print("slowest imports of the eager version:")
+    for cumulative_us, name in import_time(EAGER, repeat=1)[1][:4]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    check_budget()
+
+# Explanation:
+# animals/__init__.py imports only animals.base (the 1.py interfaces, which need just abc). Plugins are strings in
+# _BUILTIN; load(name) imports the module the first time and caches the class, and create(name) instantiates it.
+# Entry points (importlib.metadata) are read only by names() or when a name isn't built in, because reading the
+# metadata of every installed distribution is itself slow.
+# The module-level __getattr__ (PEP 562) keeps `from animals import Dog` working while still importing lazily.
+# RemoteAnimal imports requests inside sound() and asyncio inside async_sound(), so even loading that plugin is cheap.
+# import_time() runs a statement in a fresh interpreter with -X importtime, sums the per-module self times and
+# leaves out the modules the interpreter imports on its own. check_budget() (python OOP_4.py --check) fails when
+# `import animals` exceeds STARTUP_BUDGET_MS or loads one of the HEAVY modules: a startup regression test.
+# Output (numbers depend on the machine):
+# ['bird', 'cat', 'dog', 'remote']
+# pets loaded: False
+# Bark
+# Bird is flying
+# Meow
+# LookupError: no animal plugin named 'unicorn'
+# eager (imports at the top)     110.0 ms  heavy modules loaded: requests, multiprocessing, asyncio, concurrent.futures, importlib.metadata
+# lazy (import animals)            1.2 ms  heavy modules loaded: none
+# lazy + first plugin              1.2 ms  heavy modules loaded: none
+# slowest imports of the eager version:
+#       94.2 ms  requests
+#       21.8 ms  asyncio
+#        4.6 ms  multiprocessing
+#        1.8 ms  animals.pets
+# import animals: 1.3 ms (budget 15 ms), heavy modules: none
+# Key Points:
+# Keep import time side-effect free: no network calls, threads or processes at module level.
+# Import heavy dependencies where they are used; the module cache (sys.modules) makes the second import free.
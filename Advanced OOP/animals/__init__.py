@@ -0,0 +1,75 @@
+"""Animal plugins, discovered by name and imported on first use.
+
+Built-in plugins are listed below as "module:attribute" strings; installed packages can add their own under the
+"python_advanced.animals" entry point group. Nothing is imported until a plugin is actually asked for.
+"""
+from animals.base import Animal, Flyable, Movable
+
+ENTRY_POINT_GROUP = "python_advanced.animals"
+
+_BUILTIN = {
+    "dog": "animals.pets:Dog",
+    "cat": "animals.pets:Cat",
+    "bird": "animals.birds:Bird",
+    "remote": "animals.remote:RemoteAnimal",
+}
+_specs = dict(_BUILTIN)
+_loaded = {}
+_entry_points_scanned = False
+
+
+def _scan_entry_points():
+    # importlib.metadata reads every installed distribution's metadata: only do it when a name isn't built in
+    global _entry_points_scanned
+    if not _entry_points_scanned:
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            _specs.setdefault(entry_point.name, entry_point.value)
+        _entry_points_scanned = True
+
+
+def register(name, spec):
+    """Add a plugin at run time, e.g. register("parrot", "my_pkg.parrot:Parrot"). Nothing is imported yet."""
+    _specs[name] = spec
+    _loaded.pop(name, None)
+
+
+def names():
+    _scan_entry_points()
+    return sorted(_specs)
+
+
+def load(name):
+    """The plugin class called `name`, importing its module the first time."""
+    try:
+        return _loaded[name]
+    except KeyError:
+        pass
+    if name not in _specs:
+        _scan_entry_points()
+    try:
+        spec = _specs[name]
+    except KeyError:
+        raise LookupError(f"no animal plugin named {name!r}") from None
+    import importlib
+    module_name, _, attribute = spec.partition(":")
+    cls = getattr(importlib.import_module(module_name), attribute)
+    if not issubclass(cls, Animal):
+        raise TypeError(f"plugin {name!r} ({spec}) is not an Animal")
+    _loaded[name] = cls
+    return cls
+
+
+def create(name, *args, **kwargs):
+    return load(name)(*args, **kwargs)
+
+
+def __getattr__(attribute):
+    # PEP 562: `from animals import Dog` imports animals.pets only at that moment
+    for name, spec in _BUILTIN.items():
+        if spec.rpartition(":")[2] == attribute:
+            return load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {attribute!r}")
+
+
+__all__ = ["Animal", "Movable", "Flyable", "register", "names", "load", "create"]
@@ -0,0 +1,23 @@
+# The interfaces from 1.py. Importing them costs only the abc module.
+from abc import ABC, abstractmethod
+
+
+class Animal(ABC):
+    @abstractmethod
+    def sound(self):
+        pass
+
+    def eat(self):
+        return "This animal is eating"
+
+
+class Movable(ABC):
+    @abstractmethod
+    def move(self):
+        pass
+
+
+class Flyable(ABC):
+    @abstractmethod
+    def fly(self):
+        pass
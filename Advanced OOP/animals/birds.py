@@ -0,0 +1,13 @@
+# Bird from 1.py
+from animals.base import Animal, Flyable, Movable
+
+
+class Bird(Animal, Movable, Flyable):
+    def sound(self):
+        return "Tweet"
+
+    def move(self):
+        return "Bird is moving"
+
+    def fly(self):
+        return "Bird is flying"
@@ -0,0 +1,12 @@
+# Dog and Cat from 1.py
+from animals.base import Animal
+
+
+class Dog(Animal):
+    def sound(self):
+        return "Bark"
+
+
+class Cat(Animal):
+    def sound(self):
+        return "Meow"
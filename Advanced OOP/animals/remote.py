@@ -0,0 +1,17 @@
+# An animal whose sound comes from an HTTP API. requests is imported on the first call, not when this module loads,
+# so listing or even importing the plugin stays cheap.
+from animals.base import Animal
+
+
+class RemoteAnimal(Animal):
+    def __init__(self, url="https://jsonplaceholder.typicode.com/posts/1", timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def sound(self):
+        import requests  # Deferred: ~100 ms of imports (urllib3, ssl, charset detection) paid only when used
+        return requests.get(self.url, timeout=self.timeout).json()
+
+    async def async_sound(self):
+        import asyncio  # Deferred as well: only the async path needs the event loop machinery
+        return await asyncio.to_thread(self.sound)
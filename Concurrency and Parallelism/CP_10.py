@@ -0,0 +1,334 @@
+# CP_1.py and CP_3.py start a brand-new multiprocessing.Process for every task. A new process has to start an
+# interpreter (with the "spawn" start method) and import every module the task needs, numpy for example, before
+# it does any work. That costs tens of milliseconds per task, far more than a short task itself.
+# A warm pool pays that cost once:
+# The "forkserver" start method starts one small server process; with set_forkserver_preload() it imports the heavy
+# modules once, and every worker is forked from it already warm, without inheriting the parent's threads and locks.
+# Workers stay alive and take task after task.
+# A worker is replaced (recycled) after N tasks or when its memory grows past a threshold, so leaks can't pile up,
+# and idle workers are pinged: one that doesn't answer, or dies, is replaced, and its task fails instead of hanging.
+
+# Example: A warm, reusable process pool with forkserver preloading
+import concurrent.futures
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import resource
+import statistics
+import threading
+import time
+from collections import deque
+
+import numpy as np  # The "heavy" dependency: every cold process has to import it again
+
+from CP_5 import available_cores
+
+
+class WorkerCrashed(Exception):
+    """The worker running the task died (killed, segfault, os._exit) before returning a result."""
+
+
+def rss_mb():
+    """Current resident memory of this process in MB (Linux /proc; elsewhere the peak from getrusage)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _worker_main(conn, max_tasks, max_rss_mb):
+    tasks = 0
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return  # The pool went away
+        if message is None:
+            return
+        if message == "ping":
+            conn.send(("pong", None, None, False))
+            continue
+        task_id, func, args = message
+        try:
+            ok, value = True, func(*args)
+        except Exception as exc:
+            ok, value = False, exc
+        tasks += 1
+        # Retiring is announced with the result, so the pool never sends a task to a worker that is exiting
+        retiring = tasks >= max_tasks or bool(max_rss_mb and rss_mb() > max_rss_mb)
+        conn.send((task_id, ok, value, retiring))
+        if retiring:
+            return
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "task", "ping_sent")
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.task = None       # (task_id, future) while busy
+        self.ping_sent = None  # Monotonic time of an unanswered ping
+
+
+class WarmPool:
+    """A pool of long-lived worker processes forked from a preloaded fork server.
+
+    max_tasks: replace a worker after this many tasks. max_rss_mb: replace it when its memory exceeds this.
+    Idle workers are pinged every health_interval seconds and replaced if they don't answer within ping_timeout.
+    """
+
+    def __init__(self, workers=None, max_tasks=1000, max_rss_mb=None, preload=("__main__", "numpy"),
+                 method="forkserver", health_interval=1.0, ping_timeout=5.0):
+        self.ctx = multiprocessing.get_context(method)
+        if method == "forkserver":
+            self.ctx.set_forkserver_preload(list(preload))
+        self.size = workers or available_cores()
+        self.max_tasks = max_tasks
+        self.max_rss_mb = max_rss_mb
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.stats = {"started": 0, "tasks": 0, "recycled": 0, "crashed": 0, "unresponsive": 0}
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._wake_reader, self._wake_writer = multiprocessing.Pipe(duplex=False)
+        self._wake_sent = False  # A wake-up byte is on its way to the manager (guarded by _lock)
+        self._closing = False
+        self._workers = [self._start_worker() for _ in range(self.size)]
+        self._manager = threading.Thread(target=self._manage, daemon=True)
+        self._manager.start()
+
+    def _start_worker(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        process = self.ctx.Process(target=_worker_main, args=(child_conn, self.max_tasks, self.max_rss_mb),
+                                   daemon=True)
+        process.start()
+        child_conn.close()
+        self.stats["started"] += 1
+        return _Worker(process, parent_conn)
+
+    def submit(self, func, *args):
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("cannot submit after shutdown")
+            self._pending.append((next(self._ids), func, args, future))
+            wake, self._wake_sent = not self._wake_sent, True
+        if wake:  # Outside the lock: a full pipe must not block the manager, which needs the lock to drain it
+            self._wake_writer.send_bytes(b"")
+        return future
+
+    def map(self, func, iterable):
+        futures = [self.submit(func, item) for item in iterable]
+        return [future.result() for future in futures]
+
+    def _replace(self, worker, reason):
+        self.stats[reason] += 1
+        worker.conn.close()
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join()
+        if worker.task is not None:
+            task_id, future = worker.task
+            future.set_exception(WorkerCrashed(f"worker {worker.process.pid} died running task {task_id} "
+                                               f"(exit code {worker.process.exitcode})"))
+        index = self._workers.index(worker)
+        self._workers[index] = self._start_worker()
+
+    def _dispatch(self):
+        for worker in self._workers:
+            if worker.task is None and worker.ping_sent is None:
+                with self._lock:
+                    if not self._pending:
+                        return
+                    task_id, func, args, future = self._pending.popleft()
+                if not (future.running() or future.set_running_or_notify_cancel()):  # Running: a requeued task
+                    continue
+                try:
+                    worker.conn.send((task_id, func, args))
+                except OSError:  # The worker died while idle: the task never started, so give it to another one
+                    with self._lock:
+                        self._pending.appendleft((task_id, func, args, future))
+                    self._replace(worker, "crashed")
+                    return
+                except Exception as exc:  # Unpicklable function or arguments
+                    future.set_exception(exc)
+                    continue
+                worker.task = (task_id, future)
+
+    def _health_check(self, now):
+        for worker in list(self._workers):
+            if worker.ping_sent is not None and now - worker.ping_sent > self.ping_timeout:
+                self._replace(worker, "unresponsive")
+            elif worker.task is None and worker.ping_sent is None:
+                worker.ping_sent = now
+                try:
+                    worker.conn.send("ping")
+                except OSError:
+                    self._replace(worker, "crashed")
+
+    def _manage(self):
+        last_check = time.monotonic()
+        while True:
+            self._dispatch()
+            if self._closing and not self._pending and all(w.task is None for w in self._workers):
+                return
+            connections = [w.conn for w in self._workers] + [self._wake_reader]
+            for ready in multiprocessing.connection.wait(connections, timeout=self.health_interval):
+                if ready is self._wake_reader:
+                    with self._lock:
+                        self._wake_sent = False  # Submissions from now on send a new byte
+                    while self._wake_reader.poll():
+                        self._wake_reader.recv_bytes()
+                    continue
+                worker = next(w for w in self._workers if w.conn is ready)
+                try:
+                    task_id, ok, value, retiring = ready.recv()
+                except (EOFError, OSError):
+                    self._replace(worker, "crashed")
+                    continue
+                if task_id == "pong":
+                    worker.ping_sent = None
+                    continue
+                future, worker.task = worker.task[1], None
+                self.stats["tasks"] += 1
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+                if retiring:
+                    worker.process.join()
+                    self._replace(worker, "recycled")
+            now = time.monotonic()
+            if now - last_check >= self.health_interval:
+                self._health_check(now)
+                last_check = now
+
+    def shutdown(self):
+        """Finish the queued tasks, then stop every worker."""
+        with self._lock:
+            self._closing = True
+            wake, self._wake_sent = not self._wake_sent, True
+        if wake:
+            self._wake_writer.send_bytes(b"")
+        self._manager.join()
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(timeout=5)
+            worker.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+
+# Tasks
+def tiny_task(number):
+    return number + int(np.int64(1))  # Needs numpy, like real tasks need their libraries
+
+
+def leaky_task(number, _leak=[]):
+    _leak.append(bytearray(8 * 2**20))  # Grows the worker by 8 MB per task, never freed
+    return number
+
+
+def crashing_task(number):
+    os._exit(1)
+
+
+def cpu_bound_task(number):  # The task from CP_3.py, returning its total
+    total = 0
+    for i in range(1, 10_000_000):
+        total += i
+    return total
+
+
+def _cold_task(conn, number):
+    conn.send(tiny_task(number))
+    conn.close()
+
+
+def cold_overhead(method, n):
+    """Per-task time when every task gets a new process, as in CP_1.py/CP_3.py."""
+    ctx = multiprocessing.get_context(method)
+    if method == "forkserver":
+        ctx.set_forkserver_preload(["__main__", "numpy"])
+    times = []
+    for i in range(n):
+        start = time.perf_counter()
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=_cold_task, args=(child_conn, i))
+        process.start()
+        child_conn.close()
+        assert parent_conn.recv() == i + 1
+        process.join()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def warm_overhead(pool, n):
+    times = []
+    for i in range(n):
+        start = time.perf_counter()
+        assert pool.submit(tiny_task, i).result() == i + 1
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(label, times):
+    print(f"{label:<36} {statistics.median(times) * 1e3:8.2f} ms/task (median)  {1 / statistics.mean(times):8.0f} tasks/s")
+
+
+if __name__ == "__main__":
+    report("cold spawn (new interpreter)", cold_overhead("spawn", 10))
+    report("cold fork", cold_overhead("fork", 50))
+    report("cold forkserver + preload", cold_overhead("forkserver", 50))
+    with WarmPool(workers=2, max_tasks=100) as pool:
+        warm_overhead(pool, 20)  # The first tasks wait for the workers to finish starting
+        report("warm pool (forkserver + preload)", warm_overhead(pool, 500))
+        start = time.perf_counter()
+        pool.map(tiny_task, range(5000))
+        print(f"{'warm pool, 5000 tasks in flight':<36} {5000 / (time.perf_counter() - start):27.0f} tasks/s")
+        print("stats:", pool.stats)
+
+    # Recycling on memory, and a crash that fails one task instead of the whole pool
+    with WarmPool(workers=2, max_rss_mb=150) as pool:
+        pool.map(leaky_task, range(40))
+        try:
+            pool.submit(crashing_task, 0).result()
+        except WorkerCrashed as exc:
+            print("WorkerCrashed:", exc)
+        print(pool.map(tiny_task, range(5)), "stats:", pool.stats)
+
+# Explanation:
+# WarmPool starts `workers` processes with the forkserver context. set_forkserver_preload(["__main__", "numpy"]) makes
+# the fork server import this module and numpy once; each worker is a fork of that server, so it starts with them loaded.
+# A manager thread keeps one pipe per worker: it sends a task to an idle worker and waits on all pipes at once
+# (multiprocessing.connection.wait), so it always knows which task each worker is running. submit() wakes it with one
+# byte on a wake-up pipe, sent outside the lock and only when no byte is already on its way, so the pipe never fills.
+# A worker counts its tasks and checks its own memory after each one; when it reaches max_tasks or max_rss_mb it says
+# so together with its result and exits, and the manager starts a replacement.
+# A pipe that breaks (the worker died) fails the task it was running with WorkerCrashed and replaces the worker;
+# idle workers are pinged every health_interval seconds and replaced if they don't answer within ping_timeout.
+# Output (a single-core sandbox; numbers depend on the machine):
+# cold spawn (new interpreter)           143.10 ms/task (median)         7 tasks/s
+# cold fork                                2.56 ms/task (median)       384 tasks/s
+# cold forkserver + preload               35.54 ms/task (median)        26 tasks/s
+# warm pool (forkserver + preload)         0.08 ms/task (median)      2245 tasks/s
+# warm pool, 5000 tasks in flight                             2308 tasks/s
+# stats: {'started': 57, 'tasks': 5520, 'recycled': 55, 'crashed': 0, 'unresponsive': 0}
+# WorkerCrashed: worker 16136 died running task 40 (exit code 1)
+# [1, 2, 3, 4, 5] stats: {'started': 5, 'tasks': 45, 'recycled': 2, 'crashed': 1, 'unresponsive': 0}
+# Cold fork is cheap here because the parent already imported numpy, but fork copies the parent's threads' locks
+# in whatever state they are in; forkserver avoids that, and the warm pool avoids paying either start per task.
+# Key Points:
+# Process start-up is a fixed cost per process: pay it once per worker, not once per task.
+# Recycling by task count or memory keeps long-lived workers from accumulating leaks.
@@ -0,0 +1,322 @@
+# cpu_bound_task in CP_2.py and CP_3.py runs its whole loop and only prints the total at the end. While it runs,
+# the caller can't tell how far it got, can't show partial results, and can't stop a job that is taking too long
+# (terminating the process throws away everything it computed).
+# A progress channel fixes that with almost no cost to the loop:
+# Every worker owns a few 64-bit slots in shared memory and writes its progress and partial result there every N
+# iterations: a handful of memory writes, no pickling, no pipe, no lock.
+# The parent reads the slots whenever it likes, as a sync or an async iterator of snapshots.
+# The parent sets a cancel flag in the same slots; the worker sees it at its next report and stops, keeping its partial result.
+
+# Example: Streaming progress, partial results and cooperative cancellation for pool workers
+import asyncio
+import concurrent.futures
+import operator
+import time
+from multiprocessing import shared_memory
+
+# One slot per task: seven int64 fields
+_SEQ, _DONE, _TOTAL, _PARTIAL, _STATE, _CANCEL, _TASK = range(7)
+_FIELDS = 7
+_INT64 = range(-2**63, 2**63)
+IDLE, RUNNING, FINISHED, CANCELLED, FAILED = range(5)
+STATE_NAMES = ("idle", "running", "finished", "cancelled", "failed")
+
+
+class Cancelled(Exception):
+    """Raised in the worker when the parent cancelled its task. .partial holds the result so far."""
+
+    def __init__(self, partial):
+        super().__init__(f"cancelled, partial result {partial}")
+        self.partial = partial
+
+    def __reduce__(self):  # Pickled back to the parent with its partial result, not with the message
+        return Cancelled, (self.partial,)
+
+
+class Progress:
+    __slots__ = ("slot", "done", "total", "partial", "state")
+
+    def __init__(self, slot, done, total, partial, state):
+        self.slot = slot
+        self.done = done
+        self.total = total
+        self.partial = partial
+        self.state = state
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+    def __repr__(self):
+        return f"Progress(slot={self.slot}, {self.fraction:.0%}, partial={self.partial}, {STATE_NAMES[self.state]})"
+
+
+class ProgressChannel:
+    """Progress slots for `slots` tasks in shared memory. Pass .handle and a slot number to each task."""
+
+    def __init__(self, slots):
+        self.slots = slots
+        self._shm = shared_memory.SharedMemory(create=True, size=slots * _FIELDS * 8)  # Zero-filled: all IDLE
+        self._view = self._shm.buf.cast("q")
+
+    @property
+    def handle(self):
+        return self._shm.name
+
+    def _read(self, slot, timeout):
+        view, base = self._view, slot * _FIELDS
+        deadline = None
+        while True:
+            seq = view[base + _SEQ]
+            if seq % 2 == 0:
+                values = (view[base + _DONE], view[base + _TOTAL], view[base + _PARTIAL], view[base + _STATE],
+                          view[base + _TASK])
+                if view[base + _SEQ] == seq:
+                    return values
+            # A write takes nanoseconds; a slot that stays mid-write belongs to a worker killed while reporting
+            now = time.monotonic()
+            deadline = deadline or now + timeout
+            if now >= deadline:
+                raise TimeoutError(f"slot {slot} stuck in the middle of a write for {timeout}s")
+
+    def read(self, slot, timeout=1.0):
+        """A consistent snapshot of one slot (seqlock: retry while the worker is in the middle of a write)."""
+        return Progress(slot, *self._read(slot, timeout)[:4])
+
+    def snapshot(self):
+        return [self.read(slot) for slot in range(self.slots)]
+
+    def cancel(self, slot=None):
+        """Ask one task (or all of them) to stop at its next progress report.
+
+        A task that has not started yet stops at its first report. The flag names the task it is meant for (its
+        number within the slot), so it never stops a later task in the same slot.
+        """
+        for index in (range(self.slots) if slot is None else [slot]):
+            _, _, _, state, task = self._read(index, 1.0)
+            self._view[index * _FIELDS + _CANCEL] = task if state == RUNNING else task + 1
+    @staticmethod
+    def _finished(snapshot, futures):
+        if futures is not None:
+            return all(future.done() for future in futures)
+        # Without futures: something has started and nothing is running (unused slots stay IDLE forever)
+        return (all(progress.state != RUNNING for progress in snapshot)
+                and any(progress.state != IDLE for progress in snapshot))
+
+    def watch(self, interval=0.1, futures=None, timeout=None):
+        """Yield a snapshot every `interval` seconds until the tasks have finished; then the final one.
+
+        Pass the tasks' `futures` to stop exactly when they are all done, even if a worker died before it could
+        report. Without them, watching stops once some task has started and no slot is RUNNING, which can be too
+        early when tasks queue for a worker. TimeoutError after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self.snapshot()
+            yield snapshot
+            if self._finished(snapshot, futures):
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"tasks still running after {timeout}s")
+            time.sleep(interval)
+
+    async def awatch(self, interval=0.1, futures=None, timeout=None):
+        """The async version of watch(), for an event loop that must not block."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self.snapshot()
+            yield snapshot
+            if self._finished(snapshot, futures):
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"tasks still running after {timeout}s")
+            await asyncio.sleep(interval)
+
+    def close(self):
+        self._view.release()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Reporter:
+    """The worker side of one slot."""
+
+    __slots__ = ("_shm", "_view", "_base", "_seq", "_task")
+
+    def __init__(self, handle, slot):
+        self._shm = shared_memory.SharedMemory(name=handle)
+        self._view = self._shm.buf.cast("q")
+        self._base = slot * _FIELDS
+        self._seq = self._view[self._base + _SEQ]  # Continue the sequence of a reused slot
+        self._task = None
+
+    def _write(self, done, partial, state, total=None):
+        # Checked before the sequence turns odd: a failed store must not leave the slot mid-write
+        done, partial = operator.index(done), operator.index(partial)
+        if done not in _INT64 or partial not in _INT64:
+            raise OverflowError(f"progress values must fit in 64 bits: done={done}, partial={partial}")
+        view, base = self._view, self._base
+        self._seq += 1
+        view[base + _SEQ] = self._seq  # Odd: a write is in progress
+        try:
+            view[base + _DONE] = done
+            view[base + _PARTIAL] = partial
+            view[base + _STATE] = state
+            if total is not None:
+                view[base + _TOTAL] = total
+                view[base + _TASK] = self._task
+        finally:
+            self._seq += 1
+            view[base + _SEQ] = self._seq  # Even again: the slot is consistent
+
+    def start(self, total):
+        total = operator.index(total)
+        if total not in _INT64:
+            raise OverflowError(f"total must fit in 64 bits: {total}")
+        self._task = self._view[self._base + _TASK] + 1  # This task's number within the slot
+        self._write(0, 0, RUNNING, total)
+
+    def update(self, done, partial):
+        """Publish progress; raise Cancelled if the parent asked this task to stop."""
+        self._write(done, partial, RUNNING)
+        if self._view[self._base + _CANCEL] == self._task:
+            self._write(done, partial, CANCELLED)
+            raise Cancelled(partial)
+
+    def finish(self, done, partial, state=FINISHED):
+        self._write(done, partial, state)
+
+    def close(self):
+        self._view.release()
+        self._shm.close()
+
+
+# cpu_bound_task from CP_3.py, without any instrumentation
+def cpu_bound_task(number, n=10_000_000):
+    total = 0
+    for i in range(1, n):
+        total += i
+    return total
+
+
+# The same loop, reporting every `every` iterations: the inner loop is untouched, the report runs n / every times
+def cpu_bound_task_with_progress(number, handle, slot, n=10_000_000, every=1 << 16):
+    reporter = Reporter(handle, slot)
+    reporter.start(n - 1)
+    total = 0
+    try:
+        for chunk_start in range(1, n, every):
+            for i in range(chunk_start, min(chunk_start + every, n)):
+                total += i
+            reporter.update(i, total)
+        reporter.finish(n - 1, total)
+        return total
+    except Cancelled:
+        raise
+    except Exception:
+        reporter.finish(0, total, FAILED)
+        raise
+    finally:
+        reporter.close()
+
+
+def best_of(calls, repeat=7):
+    """Best time of each (func, *args) call; the calls take turns, so a noisy moment hits all of them alike."""
+    times = [[] for _ in calls]
+    for _ in range(repeat):
+        for timing, (func, *args) in zip(times, calls):
+            start = time.perf_counter()
+            func(*args)
+            timing.append(time.perf_counter() - start)
+    return [min(timing) for timing in times]
+
+
+async def async_monitor(channel, futures):
+    async for snapshot in channel.awatch(interval=0.2, futures=futures, timeout=60):
+        print("  async:", [f"{progress.fraction:.0%}" for progress in snapshot])
+    return [future.result() for future in futures]
+
+
+if __name__ == "__main__":
+    # Overhead: the same loop with and without progress reporting, in this process
+    with ProgressChannel(1) as channel:
+        plain, instrumented = best_of([(cpu_bound_task, 1), (cpu_bound_task_with_progress, 1, channel.handle, 0)])
+        # The same bound without the timing noise: the cost of one report times the number of reports
+        reporter = Reporter(channel.handle, 0)
+        start = time.perf_counter()
+        for i in range(100_000):
+            reporter.update(i, i)
+        per_report = (time.perf_counter() - start) / 100_000
+        reporter.close()
+    overhead = instrumented / plain - 1
+    reports_cost = per_report * (10_000_000 // (1 << 16) + 1) / plain
+    print(f"plain loop {plain:.3f}s, with progress {instrumented:.3f}s: measured overhead {overhead:+.2%}")
+    print(f"one report {per_report * 1e9:.0f} ns, {10_000_000 // (1 << 16) + 1} reports: {reports_cost:.3%} of the loop")
+    assert reports_cost < 0.02, "progress reporting must cost less than 2% of the loop"
+
+    # Four tasks in a process pool: watch them, then cancel task 2 halfway
+    with ProgressChannel(4) as channel, concurrent.futures.ProcessPoolExecutor(4) as pool:
+        futures = [pool.submit(cpu_bound_task_with_progress, number, channel.handle, number, 20_000_000)
+                   for number in range(4)]
+        for snapshot in channel.watch(interval=0.5, futures=futures, timeout=60):
+            print(" ", snapshot[2], "| all:", [f"{progress.fraction:.0%}" for progress in snapshot])
+            if snapshot[2].fraction > 0.5:
+                channel.cancel(2)
+        for number, future in enumerate(futures):
+            try:
+                print(f"task {number}: total {future.result()}")
+            except Cancelled as exc:
+                print(f"task {number}: {exc}")
+
+    # The same from asyncio: the event loop keeps running while the workers compute
+    with ProgressChannel(2) as channel, concurrent.futures.ProcessPoolExecutor(2) as pool:
+        futures = [pool.submit(cpu_bound_task_with_progress, number, channel.handle, number, 5_000_000)
+                   for number in range(2)]
+        print("async results:", asyncio.run(async_monitor(channel, futures)))
+
+# Explanation:
+# ProgressChannel creates one shared memory block (multiprocessing.shared_memory, as in CP_7.py) with seven int64
+# fields per task: a sequence number, done, total, partial result, state, a cancel flag and the task number. Tasks
+# get only its name (.handle) and their slot number, so nothing but two small values is pickled.
+# The worker's Reporter writes the fields through a memoryview cast to int64, between two increments of the sequence
+# number (a seqlock): read() retries while the number is odd or changes, so a snapshot never mixes two reports.
+# Values are checked to be 64-bit integers before the number turns odd, and it turns even again in a finally block;
+# if a worker is killed between the two, read() gives up after `timeout` with TimeoutError instead of spinning.
+# cpu_bound_task_with_progress splits CP_3.py's loop into chunks of 65,536 iterations and reports after each chunk;
+# the inner loop stays exactly as it was. update() also checks the cancel flag and raises Cancelled, which carries
+# the partial result back to the parent through the future.
+# watch() and awatch() poll the block every `interval` seconds until the tasks' futures are done (or `timeout`
+# passes); awatch() sleeps with asyncio.sleep, so the event loop keeps running other tasks while the workers compute.
+# The futures, not the slot states, decide when to stop: a worker killed before its first report never leaves IDLE,
+# and one killed mid-task stays RUNNING. Each task that starts in a slot gets the next task number; cancel() writes
+# the number of the running task, or of the next one if none is running, so a flag never outlives its task.
+# Output (a single-core sandbox, so the four workers share one CPU; numbers depend on the machine):
+# plain loop 0.352s, with progress 0.351s: measured overhead -0.28%
+# one report 589 ns, 153 reports: 0.026% of the loop
+#   Progress(slot=2, 0%, partial=0, idle) | all: ['0%', '0%', '0%', '0%']
+#   Progress(slot=2, 18%, partial=6262064087040, running) | all: ['18%', '18%', '18%', '17%']
+#   Progress(slot=2, 35%, partial=24586543792128, running) | all: ['35%', '35%', '35%', '35%']
+#   Progress(slot=2, 51%, partial=52261167169536, running) | all: ['51%', '51%', '51%', '51%']
+#   Progress(slot=2, 51%, partial=52933329584128, cancelled) | all: ['73%', '74%', '51%', '74%']
+#   Progress(slot=2, 51%, partial=52933329584128, cancelled) | all: ['97%', '97%', '51%', '97%']
+#   Progress(slot=2, 51%, partial=52933329584128, cancelled) | all: ['100%', '100%', '51%', '100%']
+# task 0: total 199999990000000
+# task 1: total 199999990000000
+# task 2: cancelled, partial result 52933329584128
+# task 3: total 199999990000000
+#   async: ['0%', '0%']
+#   async: ['54%', '52%']
+#   async: ['100%', '100%']
+# async results: [12499997500000, 12499997500000]
+# The whole-loop comparison moves by a few percent either way from run to run: that is timing noise, not the
+# reports. 153 reports at ~600 ns each (the values are checked first) are 0.03% of the loop, which is why the 2%
+# check uses that figure.
+# Key Points:
+# Report every few thousand iterations, never every iteration: the cost is the report's, divided by the chunk size.
+# Cooperative cancellation keeps the work done so far; terminating the process throws it away.
@@ -0,0 +1,233 @@
+# CP_3.py creates process1, process2 and process3 by hand, and CP_1.py/CP_2.py do the same with threads.
+# That works for three tasks, but not for three thousand: every task pays for a new process, results are only printed,
+# and an exception in a worker is lost. concurrent.futures already solves most of this with pools of reusable workers.
+# This example puts thread pools, process pools and asyncio behind one small API, so the back end is a one-word choice.
+
+# Example: A unified parallel task executor
+import asyncio
+import concurrent.futures
+import itertools
+import math
+import os
+import threading
+import time
+
+
+def available_cores():
+    """Cores this process may actually run on (respects taskset/cgroup affinity where the OS exposes it)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _run_chunk(func, chunk, return_exceptions):
+    # Runs inside the worker: one pickled call per chunk instead of one per item
+    results = []
+    for item in chunk:
+        try:
+            results.append(func(item))
+        except Exception as exc:
+            if not return_exceptions:
+                raise
+            results.append(exc)
+    return results
+
+
+class _AsyncioPool:
+    """Run coroutine functions (or plain functions, on the loop's default thread pool) on a private event loop thread."""
+
+    def __init__(self, max_workers):
+        self._loop = asyncio.new_event_loop()
+        self._limit = asyncio.Semaphore(max_workers)  # Bound by the loop it is first used on
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    async def _call(self, func, args):
+        async with self._limit:
+            if asyncio.iscoroutinefunction(func):
+                return await func(*args)
+            return await self._loop.run_in_executor(None, func, *args)
+
+    def submit(self, func, *args):
+        return self.schedule(self._call(func, args))
+
+    def schedule(self, coroutine):
+        if self._closed:
+            coroutine.close()
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def _drain(self, cancel):
+        # Runs on the loop thread: wait for every task (including ones started meanwhile), then the default executor
+        current = asyncio.current_task()
+        while tasks := [task for task in asyncio.all_tasks() if task is not current]:
+            if cancel:
+                for task in tasks:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await self._loop.shutdown_default_executor()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        if self._closed:
+            return
+        self._closed = True
+        drained = asyncio.run_coroutine_threadsafe(self._drain(cancel_futures), self._loop)
+        drained.add_done_callback(lambda _: self._loop.call_soon_threadsafe(self._loop.stop))
+        if wait:
+            self._thread.join()
+            self._loop.close()
+
+
+class Executor:
+    """One API over the "thread", "process" and "asyncio" back ends."""
+
+    def __init__(self, backend="process", max_workers=None):
+        cores = available_cores()
+        self.backend = backend
+        if backend == "process":
+            self.max_workers = max_workers or cores
+            self._pool = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+        elif backend == "thread":
+            self.max_workers = max_workers or min(32, cores + 4)  # Same default as ThreadPoolExecutor
+            self._pool = concurrent.futures.ThreadPoolExecutor(self.max_workers)
+        elif backend == "asyncio":
+            self.max_workers = max_workers or 1000
+            self._pool = _AsyncioPool(self.max_workers)
+        else:
+            raise ValueError(f"unknown backend: {backend!r}")
+
+    def submit(self, func, *args):
+        """Schedule func(*args) and return a concurrent.futures.Future."""
+        return self._pool.submit(func, *args)
+
+    def imap(self, func, iterable, chunksize=None, return_exceptions=False):
+        """Yield func(item) for every item, in order, keeping only a few chunks in flight at a time."""
+        if chunksize is None:
+            # Aim for ~4 chunks per worker when the length is known, so all workers stay busy until the end
+            size = len(iterable) if hasattr(iterable, "__len__") else None
+            chunksize = max(1, math.ceil(size / (self.max_workers * 4))) if size else 64
+        items = iter(iterable)
+        in_flight = []
+        try:
+            while True:
+                while len(in_flight) < self.max_workers * 2:
+                    chunk = list(itertools.islice(items, chunksize))
+                    if not chunk:
+                        break
+                    if self.backend == "asyncio":
+                        in_flight.append(self._submit_async_chunk(func, chunk, return_exceptions))
+                    else:
+                        in_flight.append(self._pool.submit(_run_chunk, func, chunk, return_exceptions))
+                if not in_flight:
+                    return
+                yield from in_flight.pop(0).result()
+        finally:
+            for future in in_flight:  # The caller stopped early or something raised: don't leave work behind
+                future.cancel()
+
+    def _submit_async_chunk(self, func, chunk, return_exceptions):
+        async def run_one(item):
+            try:
+                return await self._pool._call(func, (item,))
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                return exc
+
+        async def run():
+            return await asyncio.gather(*(run_one(item) for item in chunk))
+        return self._pool.schedule(run())
+
+    def map(self, func, iterable, chunksize=None, return_exceptions=False):
+        """Like imap(), but return a list."""
+        return list(self.imap(func, iterable, chunksize, return_exceptions))
+
+    def shutdown(self, wait=True, cancel=False):
+        """Stop the workers; cancel=True drops work that has not started yet."""
+        self._pool.shutdown(wait=wait, cancel_futures=cancel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(cancel=exc_type is not None)
+
+
+# The task from CP_3.py, returning its result instead of printing it
+def cpu_bound_task(number, n=10_000_000):
+    total = 0
+    for i in range(1, n):
+        total += i
+    return number, total
+
+
+def cpu_task_small(number):
+    return cpu_bound_task(number, 2_000_000)
+
+
+def fails_on_three(number):
+    if number == 3:
+        raise ValueError("three is not allowed")
+    return number * 2
+
+
+async def io_bound_task(name, delay):
+    await asyncio.sleep(delay)
+    return name
+
+
+if __name__ == "__main__":
+    inputs = list(range(1, 17))
+    print(f"{available_cores()} cores available")
+
+    # Same call, three back ends
+    with Executor("thread") as executor:
+        start = time.perf_counter()
+        executor.map(cpu_task_small, inputs)
+        thread_time = time.perf_counter() - start
+    for workers in sorted({1, available_cores()}):
+        with Executor("process", max_workers=workers) as executor:
+            start = time.perf_counter()
+            results = executor.map(cpu_task_small, inputs)
+            elapsed = time.perf_counter() - start
+        print(f"process back end, {workers} workers: {elapsed:.2f}s")
+    print(f"thread back end (GIL-bound):  {thread_time:.2f}s")
+    print(results[:3])
+
+    with Executor("asyncio") as executor:
+        start = time.perf_counter()
+        futures = [executor.submit(io_bound_task, f"task-{i}", 1) for i in range(500)]
+        names = [future.result() for future in futures]
+        print(f"asyncio back end: {len(names)} one-second waits in {time.perf_counter() - start:.2f}s")
+
+    # Exceptions come back as results instead of killing the whole map
+    with Executor("process", max_workers=2) as executor:
+        print(executor.map(fails_on_three, range(6), chunksize=1, return_exceptions=True))
+        try:
+            executor.map(fails_on_three, range(6))
+        except ValueError as exc:
+            print("map raised:", exc)
+
+# Explanation:
+# Executor picks a concurrent.futures pool (thread/process) or a private event loop (asyncio) and sizes it from the cores
+# this process may use. submit() returns a concurrent.futures.Future for every back end.
+# imap() cuts the input into chunks, so a process pool pickles one call per chunk instead of one per item, and keeps only
+# max_workers * 2 chunks in flight, so a huge (or endless) iterable is never materialized.
+# When the caller stops early or an exception escapes, the chunks that have not started are cancelled.
+# shutdown(wait=True) of the asyncio back end runs the outstanding coroutines to completion on the loop thread (or cancels
+# them with cancel=True) and shuts down the loop's default executor before stopping the loop, as the other pools do.
+# Output (4 cores, numbers depend on the machine):
+# 4 cores available
+# process back end, 1 workers: 2.31s
+# process back end, 4 workers: 0.62s
+# thread back end (GIL-bound):  2.35s
+# [(1, 1999999000000), (2, 1999999000000), (3, 1999999000000)]
+# asyncio back end: 500 one-second waits in 1.01s
+# [0, 2, 4, ValueError('three is not allowed'), 8, 10]
+# map raised: three is not allowed
+# Key Points:
+# Workers are reused, so the process start-up cost is paid once per worker, not once per task.
+# The process back end gives near-linear speedup for CPU-bound work; threads don't, because of the GIL.
+# The asyncio back end is for many concurrent waits, not for computation.
@@ -0,0 +1,155 @@
+# In CP_3.py each multiprocessing.Process computes `total` and only prints it; the parent never sees the result.
+# The usual fix is a Queue or a Pipe, but both pickle the result in the worker, push the bytes through a pipe
+# and unpickle a second copy in the parent. For large per-worker arrays that copying dominates the run time and doubles memory.
+# multiprocessing.shared_memory gives all processes the same block of RAM. A NumPy array created on top of it (a "view")
+# lets each worker write its partial result in place, and the parent reduces the rows without serializing anything.
+
+# Example: Shared-memory result aggregation
+import multiprocessing
+import time
+import tracemalloc
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedResults:
+    """A (workers, length) array in shared memory: worker i writes row i, the parent reduces the rows."""
+
+    def __init__(self, workers, length, dtype=np.float64):
+        self.shape = (workers, length)
+        self.dtype = np.dtype(dtype)
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)) * self.dtype.itemsize)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)  # The OS hands it out zero-filled
+
+    @property
+    def handle(self):
+        """Everything a worker needs to attach: a few bytes to pickle instead of the whole array."""
+        return self._shm.name, self.shape, self.dtype.str
+
+    def reduce(self, op=np.add):
+        """Combine the per-worker rows, e.g. op=np.add for a sum or np.maximum for a max."""
+        return op.reduce(self.array, axis=0)
+
+    def close(self):
+        del self.array  # Views must be gone before the buffer can be released
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach(handle):
+    """Open a worker-side view of a SharedResults block; returns (SharedMemory, ndarray)."""
+    name, shape, dtype = handle
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+# The partial result of worker `row`; out= lets NumPy write straight into the destination
+def compute_partial(row, length, out=None):
+    return np.multiply(np.arange(length, dtype=np.float64), row + 1, out=out)
+
+
+def shm_worker(handle, row):
+    shm, array = attach(handle)
+    compute_partial(row, array.shape[1], out=array[row])  # Zero-copy: writes into the shared block
+    del array
+    shm.close()
+
+
+def queue_worker(queue, row, length):
+    queue.put((row, compute_partial(row, length)))  # Pickled, sent through a pipe, unpickled in the parent
+
+
+def pipe_worker(conn, row, length):
+    conn.send_bytes(compute_partial(row, length).tobytes())
+    conn.close()
+
+
+def run_shared_memory(workers, length):
+    with SharedResults(workers, length) as results:
+        processes = [multiprocessing.Process(target=shm_worker, args=(results.handle, row)) for row in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        failed = [(row, process.exitcode) for row, process in enumerate(processes) if process.exitcode != 0]
+        if failed:  # A crashed worker leaves its row zeroed: reducing it would return a wrong total without a word
+            raise RuntimeError(f"workers failed (row, exit code): {failed}")
+        return results.reduce()
+
+
+def run_queue(workers, length):
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=queue_worker, args=(queue, row, length)) for row in range(workers)]
+    for process in processes:
+        process.start()
+    total = np.zeros(length)
+    for _ in range(workers):
+        _, partial = queue.get()  # Must drain before join(), or a worker blocks on a full pipe
+        total += partial
+    for process in processes:
+        process.join()
+    return total
+
+
+def run_pipe(workers, length):
+    pipes = [multiprocessing.Pipe(duplex=False) for _ in range(workers)]
+    processes = [multiprocessing.Process(target=pipe_worker, args=(send, row, length))
+                 for row, (_, send) in enumerate(pipes)]
+    for process in processes:
+        process.start()
+    total = np.zeros(length)
+    for receive, _ in pipes:
+        total += np.frombuffer(receive.recv_bytes(), dtype=np.float64)
+    for process in processes:
+        process.join()
+    return total
+
+
+def parent_heap_peak_mb(run, workers, length):
+    # NumPy reports its buffers to tracemalloc, the shared block is an mmap and is not counted: exactly the copies we want
+    tracemalloc.start()
+    run(workers, length)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+if __name__ == "__main__":
+    workers, length = 4, 8_000_000  # 64 MB per worker
+    expected = np.arange(length, dtype=np.float64) * sum(range(1, workers + 1))
+    print(f"{workers} workers x {length * 8 // 2**20} MB partial results")
+    for label, run in (("shared memory", run_shared_memory), ("Pipe", run_pipe), ("Queue", run_queue)):
+        assert np.array_equal(run(workers, length), expected)  # Warm-up: first-touch page faults, worker imports
+        elapsed = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            run(workers, length)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        print(f"{label:<14} {elapsed:6.2f}s  {workers * length * 8 / 2**20 / elapsed:7.0f} MB/s  "
+              f"parent heap peak {parent_heap_peak_mb(run, workers, length):5.0f} MB")
+
+# Explanation:
+# SharedResults allocates one shared block big enough for every worker's row and wraps it in a NumPy array.
+# Only its handle (name, shape, dtype) is pickled to the workers; attach() maps the same block into the worker.
+# Each worker writes its partial result into its own row, so no locks are needed, and the parent reduces the rows
+# with a single vectorized op.reduce(axis=0). A worker that exits with a non-zero code would leave its row zeroed, so
+# run_shared_memory() checks every exit code and raises instead of reducing.
+# The Queue and Pipe versions pickle each 64 MB array, copy it through the kernel and rebuild it in the parent.
+# The benchmark runs every variant once to warm up (first-touch page faults), then keeps the best of three runs.
+# Output (numbers depend on the machine):
+# 4 workers x 61 MB partial results
+# shared memory    0.28s      878 MB/s  parent heap peak    61 MB
+# Pipe             0.70s      350 MB/s  parent heap peak   129 MB
+# Queue            2.19s      112 MB/s  parent heap peak   244 MB
+# The 61 MB left for shared memory is the reduced result itself; the others also hold received copies of the rows.
+# Key Points:
+# Shared memory removes the serialization and the second copy; the parent only reads what the workers wrote.
+# Always close() the worker views and unlink() the block once (the parent owns it), or the memory stays allocated.
+# Give every worker its own row (or slice); if two workers must update the same cells, add a multiprocessing.Lock.
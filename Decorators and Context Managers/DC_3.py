@@ -0,0 +1,341 @@
+# FileManager and open_file in 4.py open a file, write one string and close it.
+# A caller that writes many records that way reopens the file for every record and issues one small write() each time,
+# so a million records cost a million open/close system calls. Context managers are still the right tool for
+# high-volume I/O, they just need to manage more than a file handle:
+# A batched writer collects records in memory and writes them in large blocks, from a background thread.
+# mmap maps a large file into memory, so reading or patching it needs no read()/write() calls or copies.
+# An append-only record log decides how often to fsync: every record, every N records or every T milliseconds.
+# Atomic write-and-rename guarantees a reader sees either the old file or the complete new one, never half of it.
+
+# Example: Buffered, batched and memory-mapped file I/O context managers
+import mmap
+import os
+import queue
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+
+class BatchedWriter:
+    """Buffer records and write them in blocks of about `buffer_size` bytes from a background thread.
+
+    A record is written at most `flush_interval` seconds after it was added, even if the buffer isn't full.
+    """
+
+    def __init__(self, path, mode="ab", buffer_size=1 << 20, flush_interval=0.5):
+        self.path = path
+        self.mode = mode
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._buffer = []
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._blocks = queue.Queue(maxsize=8)  # Bounded: a slow disk pushes back on the writers instead of eating RAM
+        self._error = None
+
+    def __enter__(self):
+        self.file = open(self.path, self.mode, buffering=0)  # We do our own buffering
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_blocks, daemon=True)
+        self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._writer.start()
+        self._timer.start()
+        return self
+
+    def write(self, record):
+        if self._error is not None:
+            raise self._error
+        data = record if isinstance(record, bytes) else record.encode()
+        with self._lock:
+            self._buffer.append(data)
+            self._buffered += len(data)
+            self.records += 1
+            if self._buffered >= self.buffer_size:
+                self._hand_off()
+
+    def _hand_off(self):
+        if self._buffer:
+            block, self._buffer, self._buffered = b"".join(self._buffer), [], 0
+            self._blocks.put(block)
+
+    def flush(self):
+        with self._lock:
+            self._hand_off()
+        self._blocks.join()  # Wait until the writer thread has written everything handed off so far
+
+    def _write_blocks(self):
+        while True:
+            block = self._blocks.get()
+            try:
+                if block is None:
+                    return
+                if self._error is None:
+                    self.file.write(block)
+            except OSError as exc:
+                self._error = exc
+            finally:
+                self._blocks.task_done()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            with self._lock:
+                self._hand_off()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._timer.join()
+        with self._lock:
+            self._hand_off()
+        self._blocks.put(None)
+        self._writer.join()
+        self.file.close()
+        if self._error is not None and exc_type is None:
+            raise self._error
+
+
+@contextmanager
+def mmap_file(path, mode="r", size=None):
+    """Map a file into memory. mode "r" maps it read-only; mode "w" creates/resizes it to `size` bytes first."""
+    if mode == "r":
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b""  # mmap can't map an empty file
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+        return
+    if size is not None and size <= 0:  # Checked before the truncate below, which would empty the file first
+        raise ValueError(f"mmap_file({path!r}, 'w') needs a positive size, got {size}")
+    if size is None and not (os.path.exists(path) and os.path.getsize(path)):
+        raise ValueError(f"mmap_file({path!r}, 'w') needs size=... for a new or empty file: an empty file can't be mapped")
+    with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+        if size is not None:
+            f.truncate(size)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as mapped:
+            yield mapped
+            mapped.flush()  # Write the dirty pages back before the mapping is closed
+
+
+class RecordLog:
+    """Append-only log of length-prefixed records with a configurable fsync policy.
+
+    fsync="always" (every record), fsync=N (every N records) or fsync_ms=T (at most about T milliseconds of records
+    at risk: a background thread syncs whatever is unsynced every T milliseconds, also after the appends stop).
+    """
+
+    HEADER = struct.Struct("<I")  # 4-byte little-endian length in front of every record
+
+    def __init__(self, path, fsync="always", fsync_ms=None):
+        self.path = path
+        self.fsync = fsync
+        self.fsync_ms = fsync_ms
+        self.syncs = 0
+
+    def __enter__(self):
+        self.file = open(self.path, "ab")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._syncer = None
+        if self.fsync_ms is not None:
+            self._syncer = threading.Thread(target=self._sync_periodically, daemon=True)
+            self._syncer.start()
+        return self
+
+    def append(self, record):
+        data = record if isinstance(record, bytes) else record.encode()
+        with self._lock:
+            self.file.write(self.HEADER.pack(len(data)) + data)
+            self._unsynced += 1
+            if self.fsync_ms is not None:
+                due = (time.monotonic() - self._last_sync) * 1000 >= self.fsync_ms
+            elif self.fsync == "always":
+                due = True
+            else:
+                due = self._unsynced >= self.fsync
+            if due:
+                self._sync()
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.syncs += 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _sync_periodically(self):
+        # Without this, records appended just before the appends stop would wait for the next append (or close)
+        while not self._stop.wait(self.fsync_ms / 1000):
+            with self._lock:
+                if self._unsynced and (time.monotonic() - self._last_sync) * 1000 >= self.fsync_ms:
+                    self._sync()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        if self._syncer is not None:
+            self._syncer.join()
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+        self.file.close()
+
+    @classmethod
+    def read(cls, path):
+        """Yield every complete record; a torn record at the end (crash mid-write) is ignored."""
+        with mmap_file(path) as data:
+            offset, size = 0, len(data)
+            while offset + cls.HEADER.size <= size:
+                (length,) = cls.HEADER.unpack_from(data, offset)
+                start = offset + cls.HEADER.size
+                if start + length > size:
+                    return
+                yield bytes(data[start:start + length])
+                offset = start + length
+
+
+def _fsync_directory(directory):
+    """Make a rename in `directory` durable: the new directory entry is only on disk after the directory is synced."""
+    if os.name != "posix":
+        return  # Windows can't open a directory; NTFS journals the rename itself
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _create_temp(directory):
+    """Create a new temporary file in `directory` with mode 0o666, which the kernel narrows by the umask.
+
+    Reading the umask would mean setting it (os.umask), and that changes it for every thread for a moment.
+    """
+    flags = os.O_CREAT | os.O_EXCL | os.O_RDWR | getattr(os, "O_BINARY", 0)
+    while True:
+        tmp_path = os.path.join(directory, f".tmp-{os.urandom(6).hex()}")
+        try:
+            return os.open(tmp_path, flags, 0o666), tmp_path
+        except FileExistsError:
+            continue
+
+
+@contextmanager
+def atomic_write(path, mode="w"):
+    """Write to a temporary file next to `path`, fsync it and rename it over `path` only if the block succeeds.
+
+    The new file keeps the permissions of the file it replaces (or gets the usual umask-based ones), not mkstemp's 0600.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        permissions = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        permissions = None
+    fd, tmp_path = _create_temp(directory)  # Same file system, so the rename is atomic
+    try:
+        with os.fdopen(fd, mode) as f:
+            if permissions is not None:
+                os.chmod(tmp_path, permissions)
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+# FileManager from 4.py, used the way callers use it today: one open/write/close per record
+class FileManager:
+    def __init__(self, filename, mode):
+        self.filename = filename
+        self.mode = mode
+
+    def __enter__(self):
+        self.file = open(self.filename, self.mode)
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.close()
+
+
+def report(label, records, record_size, elapsed):
+    print(f"{label:<40} {records / elapsed:10.0f} records/s  {records * record_size / elapsed / 2**20:7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "sample.txt")
+    record = "Hello, World! " * 7 + "\n"  # ~100 bytes
+    n = 200_000
+
+    start = time.perf_counter()
+    for _ in range(n // 10):  # A tenth of the records, the per-record open/close is that slow
+        with FileManager(path, "a") as f:
+            f.write(record)
+    report("FileManager per record", n // 10, len(record), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with BatchedWriter(path, buffer_size=1 << 20) as writer:
+        for _ in range(n):
+            writer.write(record)
+    report("BatchedWriter", n, len(record), time.perf_counter() - start)
+
+    log_path = os.path.join(workdir, "records.log")
+    for label, options, count in (("RecordLog fsync=always", {"fsync": "always"}, 500),
+                                  ("RecordLog fsync every 1000", {"fsync": 1000}, n),
+                                  ("RecordLog fsync every 10 ms", {"fsync_ms": 10}, n)):
+        start = time.perf_counter()
+        with RecordLog(log_path, **options) as log:
+            for _ in range(count):
+                log.append(record)
+        report(f"{label} ({log.syncs} fsyncs)", count, len(record), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    records = sum(1 for _ in RecordLog.read(log_path))
+    report("RecordLog.read via mmap", records, len(record), time.perf_counter() - start)
+
+    # Patch a large file in place through mmap: no read/modify/write of the whole file
+    big = os.path.join(workdir, "big.bin")
+    with mmap_file(big, "w", size=256 * 2**20) as mapped:
+        start = time.perf_counter()
+        for offset in range(0, len(mapped), 4096):
+            mapped[offset:offset + 8] = b"PAGEHEAD"
+        print(f"mmap: stamped {len(mapped) // 4096} pages in {time.perf_counter() - start:.2f}s")
+
+    with atomic_write(os.path.join(workdir, "config.json")) as f:
+        f.write('{"key": "value"}')
+    print(open(os.path.join(workdir, "config.json")).read())
+    shutil.rmtree(workdir)
+
+# Explanation:
+# BatchedWriter.write() only appends to a list; once ~buffer_size bytes are collected they are joined into one block
+# and handed to a writer thread through a bounded queue, so the caller never waits for the disk unless the disk falls behind.
+# A timer thread hands off whatever is buffered every flush_interval seconds, and __exit__ drains everything.
+# mmap_file() yields an mmap object: slicing it reads the file, assigning to a slice writes it, and the OS pages data in on demand.
+# RecordLog prefixes every record with its length, so RecordLog.read() can walk the file (through mmap) and stop
+# cleanly at a torn last record. The fsync policy trades durability (records lost on power failure) for speed; with
+# fsync_ms a background thread also syncs records left unsynced after the last append, so the window really is ~T ms.
+# atomic_write() writes a temporary file in the same directory with the target's permissions (a new file is created
+# with 0o666 and the kernel applies the umask), fsyncs it, renames it over the target and fsyncs the directory, so the
+# rename itself survives a power failure.
+# Output (numbers depend on the machine and the disk):
+# FileManager per record                       111439 records/s     10.5 MB/s
+# BatchedWriter                               1437857 records/s    135.8 MB/s
+# RecordLog fsync=always (500 fsyncs)            6599 records/s      0.6 MB/s
+# RecordLog fsync every 1000 (200 fsyncs)      909776 records/s     85.9 MB/s
+# RecordLog fsync every 10 ms (19 fsyncs)      944166 records/s     89.1 MB/s
+# RecordLog.read via mmap                     1994639 records/s    188.3 MB/s
+# mmap: stamped 65536 pages in 1.17s
+# {"key": "value"}
+# Key Points:
+# Fewer, larger writes are what make I/O fast; buffering in the application also saves the per-call Python overhead.
+# fsync is the expensive part of durability: sync by count or by time unless every single record must survive a crash.
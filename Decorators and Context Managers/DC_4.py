@@ -0,0 +1,287 @@
+# open_file and FileManager in 4.py are synchronous. Used inside asyncio code like CP_4.py, every open(), write()
+# and close() blocks the event loop, and while it is blocked no other task can run: timers fire late and
+# network responses wait. Async context managers (async with) solve this:
+# @asynccontextmanager works like @contextmanager, but setup and cleanup can await.
+# File operations are handed to a thread pool with run_in_executor, so the loop keeps running while the disk works.
+# An async resource pool hands out a bounded number of expensive objects (HTTP sessions, file handles), checks that
+# they are still healthy, times out when none is free, and drains in-flight users before shutting down.
+
+# Example: Async context managers and async resource pools
+import asyncio
+import inspect
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+FILE_IO = ThreadPoolExecutor(max_workers=8, thread_name_prefix="file-io")
+
+
+async def _run(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(FILE_IO, func, *args)
+
+
+class AsyncFile:
+    """A file object whose blocking methods run on the file I/O thread pool."""
+
+    def __init__(self, file):
+        self.file = file
+
+    async def write(self, data):
+        return await _run(self.file.write, data)
+
+    async def read(self, size=-1):
+        return await _run(self.file.read, size)
+
+    async def flush(self):
+        return await _run(self.file.flush)
+
+    async def close(self):
+        return await _run(self.file.close)
+
+
+@asynccontextmanager
+async def async_open(file, mode="r"):
+    """The async counterpart of open_file in 4.py."""
+    f = AsyncFile(await _run(open, file, mode))
+    try:
+        yield f
+    finally:
+        await f.close()
+
+
+class PoolTimeout(Exception):
+    """No resource became available within the acquire timeout."""
+
+
+class PoolClosed(Exception):
+    """The pool is shutting down and hands out no more resources."""
+
+
+async def _maybe_await(value):
+    return await value if inspect.isawaitable(value) else value
+
+
+class AsyncResourcePool:
+    """Keep between min_size and max_size resources made by `factory` (sync or async).
+
+    health_check(resource) -> bool is run before a pooled resource is handed out; unhealthy ones are closed and replaced.
+    """
+
+    def __init__(self, factory, min_size=0, max_size=10, health_check=None, close=None, acquire_timeout=5):
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.health_check = health_check
+        self.close_resource = close
+        self.acquire_timeout = acquire_timeout
+        self.stats = {"created": 0, "reused": 0, "replaced": 0, "timeouts": 0}
+        self._idle = []
+        self._size = 0  # Idle + in use + being created
+        self._in_use = 0
+        self._closing = False
+        self._cond = asyncio.Condition()
+
+    async def start(self):
+        for _ in range(self.min_size):
+            self._idle.append(await self._create())
+        return self
+
+    async def _create(self):
+        self._size += 1
+        try:
+            resource = await _maybe_await(self.factory())
+        except BaseException:
+            self._size -= 1
+            raise
+        self.stats["created"] += 1
+        return resource
+
+    async def _destroy(self, resource):
+        self._size -= 1
+        if self.close_resource is not None:
+            await _maybe_await(self.close_resource(resource))
+
+    async def _get(self):
+        while True:
+            async with self._cond:
+                if self._closing:
+                    raise PoolClosed("pool is shutting down")
+                if self._idle:
+                    resource = self._idle.pop()
+                elif self._size < self.max_size:
+                    resource = None
+                    self._size += 1  # Reserve the slot before creating outside the lock
+                else:
+                    await self._cond.wait()
+                    continue
+                self._in_use += 1
+            if resource is None:
+                self._size -= 1  # _create() counts it again
+                try:
+                    return await self._create()
+                except BaseException:
+                    await self._release_slot()
+                    raise
+            try:
+                healthy = self.health_check is None or await _maybe_await(self.health_check(resource))
+            except BaseException:  # Timed out or cancelled mid-check: the resource's state is unknown, so close it
+                await self._discard(resource)
+                raise
+            if healthy:
+                self.stats["reused"] += 1
+                return resource
+            self.stats["replaced"] += 1
+            await self._discard(resource)
+
+    async def _discard(self, resource):
+        """Close a resource counted as in use and give its slot back, even if closing it is interrupted."""
+        try:
+            await self._destroy(resource)
+        finally:
+            await self._release_slot()
+
+    async def _release_slot(self):
+        async with self._cond:
+            self._in_use -= 1
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def acquire(self):
+        try:
+            resource = await asyncio.wait_for(self._get(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise PoolTimeout(f"no resource free within {self.acquire_timeout}s") from None
+        try:
+            yield resource
+        finally:
+            async with self._cond:
+                self._in_use -= 1
+                if self._closing:
+                    await self._destroy(resource)
+                else:
+                    self._idle.append(resource)
+                self._cond.notify_all()
+
+    async def close(self):
+        """Stop handing out resources, wait for the ones in use to come back, then close everything."""
+        async with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            await self._cond.wait_for(lambda: self._in_use == 0)
+            idle, self._idle = self._idle, []
+        for resource in idle:
+            await self._destroy(resource)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+def http_session_pool(max_size=4, **session_kwargs):
+    """A pool of aiohttp.ClientSession objects (for example one per upstream credential)."""
+    import aiohttp
+    return AsyncResourcePool(lambda: aiohttp.ClientSession(**session_kwargs), max_size=max_size,
+                             health_check=lambda session: not session.closed, close=lambda session: session.close())
+
+
+def file_handle_pool(path, mode="ab", max_size=4):
+    """A pool of open handles to one file, opened and closed on the file I/O threads."""
+    return AsyncResourcePool(lambda: _run(open, path, mode), max_size=max_size,
+                             health_check=lambda f: not f.closed, close=lambda f: _run(f.close))
+
+
+# Measure how late the event loop wakes a task that sleeps for 5 ms at a time
+async def heartbeat(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append((time.perf_counter() - start - 0.005) * 1000)
+
+
+async def heavy_io(path, blocking, chunks=200, chunk=b"x" * (1 << 20)):
+    for _ in range(chunks):
+        if blocking:
+            with open(path, "ab") as f:  # open_file/FileManager style, straight on the event loop
+                f.write(chunk)
+                os.fsync(f.fileno())
+            await asyncio.sleep(0)
+        else:
+            async with async_open(path, "ab") as f:
+                await f.write(chunk)
+                await _run(os.fsync, f.file.fileno())
+
+
+async def measure(label, path, blocking):
+    lags, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    start = time.perf_counter()
+    await heavy_io(path, blocking)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    p99 = sorted(lags)[int(0.99 * (len(lags) - 1))]
+    print(f"{label:<20} 200 MB in {elapsed:5.2f}s  heartbeats {len(lags):4}  loop lag p50 "
+          f"{statistics.median(lags):6.2f} ms  p99 {p99:7.2f} ms  max {max(lags):7.2f} ms")
+
+
+async def main():
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "sample.txt")
+
+    async with async_open(path, "w") as f:
+        await f.write("Hello, World!")
+    async with async_open(path) as f:
+        print(await f.read())
+
+    await measure("blocking open/write", path, blocking=True)
+    await measure("async_open", path, blocking=False)
+
+    # Many tasks share four file handles; close() waits for the writers still holding one
+    async with file_handle_pool(os.path.join(workdir, "log.txt"), max_size=4) as pool:
+        async def log(i):
+            async with pool.acquire() as f:
+                await _run(f.write, f"record {i}\n".encode())
+        await asyncio.gather(*(log(i) for i in range(1000)))
+        print("file handle pool:", pool.stats)
+
+    # Acquire timeout: one resource, held for longer than the timeout
+    pool = await AsyncResourcePool(object, max_size=1, acquire_timeout=0.1).start()
+    async with pool.acquire():
+        try:
+            async with pool.acquire():
+                pass
+        except PoolTimeout as exc:
+            print("PoolTimeout:", exc)
+    await pool.close()
+    shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+
+# Explanation:
+# async_open() is open_file from 4.py with `async` in front: open(), write(), read() and close() run on the FILE_IO
+# thread pool, and the coroutine awaits them, so other tasks keep running while the disk works.
+# AsyncResourcePool.acquire() is an async context manager: it hands out an idle resource (after its health check)
+# or creates a new one while fewer than max_size exist, and otherwise waits on an asyncio.Condition until one is
+# returned, giving up after acquire_timeout seconds with PoolTimeout.
+# If the timeout (or a cancellation) hits during a health check or while an unhealthy resource is being closed,
+# that resource is closed and its slot given back, so close() never waits for a slot nobody holds.
+# close() refuses new acquisitions, waits until every resource in use has been returned, then closes them all.
+# The heartbeat task sleeps 5 ms at a time and records how late it wakes up: that lateness is the event-loop lag.
+# Output (a single-core sandbox, where the file I/O threads still compete with the loop for the one CPU):
+# Hello, World!
+# blocking open/write  200 MB in  2.03s  heartbeats   67  loop lag p50  21.79 ms  p99   45.48 ms  max   46.98 ms
+# async_open           200 MB in  3.13s  heartbeats  332  loop lag p50   3.62 ms  p99   13.61 ms  max   43.07 ms
+# file handle pool: {'created': 4, 'reused': 996, 'replaced': 0, 'timeouts': 0}
+# PoolTimeout: no resource free within 0.1s
+# Key Points:
+# Anything that blocks (file I/O, fsync, DNS, CPU work) belongs in run_in_executor/asyncio.to_thread, not on the loop.
+# Pools bound how many expensive resources exist at once and let many tasks share them fairly.
@@ -0,0 +1,284 @@
+# T_1.py checks that add() and process_data() return the right values, but nothing checks how fast anything is.
+# A change that makes the HTTP client reconnect on every call, or a decorator that doubles the cost of every call,
+# passes every correctness test. A benchmark suite catches those before they ship:
+# Warmup runs first (imports, caches, connection pools), then many repeated runs, because one timing means nothing.
+# Results are summarized with robust statistics (median, IQR) and compared with a rank test, not by eye.
+# Every saved run is appended to a JSON history, and a pytest mode fails when a benchmark is significantly slower
+# than the last saved run by more than a threshold.
+
+# Example: A benchmark harness with JSON history and a pytest regression gate
+# python T_2.py              run every benchmark and compare with the history
+# python T_2.py --save http  run the benchmarks whose name contains "http" and append the results to the history
+# pytest T_2.py              fail when a benchmark regressed (BENCH_THRESHOLD, default 0.20 = 20% slower)
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("Concurrency and Parallelism", "Working with APIs", "Decorators and Context Managers"):
+    sys.path.insert(0, os.path.join(ROOT, folder))
+
+# Kept under .pytest_cache (gitignored), like T_3.py's test durations, not next to the sources
+HISTORY = os.environ.get("BENCH_HISTORY", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pytest_cache",
+                                                       "bench_history.json"))
+THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", 0.20))
+BENCHMARKS = {}
+
+
+def benchmark(name, setup=None, teardown=None):
+    """Register func as a benchmark. setup() runs once before timing and its result is passed to func."""
+    def decorator(func):
+        BENCHMARKS[name] = (func, setup, teardown)
+        return func
+    return decorator
+
+
+def measure(func, *args, warmup=3, repeat=20, min_time=0.01):
+    """Per-call times (seconds) of `repeat` runs, each calling func enough times to last at least min_time."""
+    for _ in range(warmup):
+        func(*args)
+    number = 1
+    while True:  # Calibrate like timeit.autorange: short calls are timed in loops, so the clock resolution doesn't matter
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    quartiles = statistics.quantiles(ordered, n=4) if len(ordered) > 1 else [ordered[0]] * 3
+    return {"min": ordered[0], "median": statistics.median(ordered), "mean": statistics.fmean(ordered),
+            "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0, "iqr": quartiles[2] - quartiles[0],
+            "runs": len(ordered)}
+
+
+def mann_whitney_p(baseline, current):
+    """One-sided p-value that `current` is slower than `baseline` (Mann-Whitney U, normal approximation).
+
+    A rank test makes no assumption about the shape of the distribution, and a few outliers (a GC pause,
+    another process waking up) can't swing it the way they swing a mean.
+    """
+    n1, n2 = len(baseline), len(current)
+    ranked = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    ranks, i = [0.0] * len(ranked), 0
+    while i < len(ranked):  # Tied values share the average of their ranks
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, ranked) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    z = (u - n1 * n2 / 2) / math.sqrt(n1 * n2 * (n1 + n2 + 1) / 12)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(baseline, current, threshold=THRESHOLD, alpha=0.01):
+    """Compare two lists of samples. A regression is both significant (p < alpha) and larger than threshold."""
+    change = statistics.median(current) / statistics.median(baseline) - 1
+    p = mann_whitney_p(baseline, current)
+    return {"change": change, "p": p, "regressed": p < alpha and change > threshold}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class History:
+    """Benchmark results over time: {name: [run, ...]} in a JSON file, written atomically."""
+
+    def __init__(self, path=HISTORY, keep=50):
+        self.path = path
+        self.keep = keep
+        try:
+            with open(path) as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            self.data = {}
+
+    def last(self, name):
+        runs = self.data.get(name)
+        return runs[-1] if runs else None
+
+    def baseline(self, name, runs=5):
+        """Samples of the last `runs` saved runs pooled together, so run-to-run noise is part of the baseline."""
+        return [sample for run in self.data.get(name, [])[-runs:] for sample in run["samples"]]
+
+    def append(self, name, samples):
+        run = {"time": time.time(), "commit": git_commit(), "python": platform.python_version(),
+               "machine": platform.node(), "summary": summarize(samples), "samples": samples}
+        self.data.setdefault(name, []).append(run)
+        del self.data[name][:-self.keep]
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.data, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)  # No half-written .tmp- file left behind
+            raise
+
+
+def run_benchmark(name, **options):
+    func, setup, teardown = BENCHMARKS[name]
+    state = setup() if setup else None
+    try:
+        return measure(func, *(() if setup is None else (state,)), **options)
+    finally:
+        if teardown:
+            teardown(state)
+
+
+# Concurrency examples
+@benchmark("concurrency.executor_thread_map", setup=lambda: __import__("CP_5").Executor("thread", 4),
+           teardown=lambda executor: executor.shutdown())
+def bench_executor_map(executor):
+    executor.map(abs, range(2000))  # A trivial task: this measures the executor's own dispatch overhead
+
+
+@benchmark("concurrency.range_sum_numpy")
+def bench_range_sum():
+    from CP_6 import sum_numpy
+    sum_numpy(0, 2_000_000, power=2)
+
+
+# HTTP helpers against the local stub server
+def start_client():
+    from API_1 import PooledClient, start_stub_server
+    server = start_stub_server()
+    return server, PooledClient(server.url)
+
+
+def stop_client(state):
+    server, client = state
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+@benchmark("http.pooled_get", setup=start_client, teardown=stop_client)
+def bench_pooled_get(state):
+    state[1].get("/data")
+
+
+# Decorators
+@benchmark("decorators.timed_call", setup=lambda: __import__("DC_1").timed(lambda a, b: a + b))
+def bench_timed_call(add):
+    for _ in range(100):
+        add(1, 2)
+
+
+@benchmark("decorators.memoize_hit", setup=lambda: __import__("DC_2").memoize(lambda x: x * x, maxsize=64))
+def bench_memoize_hit(square):
+    for i in range(100):
+        square(i % 32)
+
+
+# File context managers
+@benchmark("files.batched_writer", setup=tempfile.mkdtemp, teardown=shutil.rmtree)
+def bench_batched_writer(workdir):
+    from DC_3 import BatchedWriter
+    with BatchedWriter(os.path.join(workdir, "records.log"), mode="wb") as writer:
+        for _ in range(10_000):
+            writer.write(b"Hello, World! " * 7 + b"\n")
+
+
+@benchmark("files.atomic_write", setup=tempfile.mkdtemp, teardown=shutil.rmtree)
+def bench_atomic_write(workdir):
+    from DC_3 import atomic_write
+    with atomic_write(os.path.join(workdir, "config.json")) as f:
+        f.write('{"key": "value"}')
+
+
+# pytest mode: one test per benchmark, compared with the last saved runs
+@pytest.mark.parametrize("name", sorted(BENCHMARKS))
+def test_no_regression(name):
+    history = History()
+    baseline = history.baseline(name)
+    if not baseline:
+        pytest.skip(f"no saved history for {name}: run `python T_2.py --save` first")
+    result = compare(baseline, run_benchmark(name))
+    if result["regressed"]:
+        result = compare(baseline, run_benchmark(name))  # Confirm with a fresh measurement before failing
+    assert not result["regressed"], (f"{name} is {result['change']:+.1%} slower than commit "
+                                     f"{history.last(name)['commit']} (p={result['p']:.4f}, threshold {THRESHOLD:.0%})")
+
+
+def test_compare_detects_a_slowdown():
+    baseline = [1.0 + i / 100 for i in range(20)]
+    assert compare(baseline, [value * 1.5 for value in baseline])["regressed"]
+    assert not compare(baseline, list(reversed(baseline)))["regressed"]
+
+
+if __name__ == "__main__":
+    save = "--save" in sys.argv
+    patterns = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    history = History()
+    print(f"{'benchmark':<36} {'median':>10} {'IQR':>10}  {'vs saved runs':<28}")
+    for name in sorted(BENCHMARKS):
+        if patterns and not any(pattern in name for pattern in patterns):
+            continue
+        samples = run_benchmark(name)
+        stats = summarize(samples)
+        if history.last(name) is None:
+            verdict = "no history"
+        else:
+            result = compare(history.baseline(name), samples)
+            verdict = f"{result['change']:+7.1%} p={result['p']:.3f}" + ("  REGRESSED" if result["regressed"] else "")
+        print(f"{name:<36} {stats['median'] * 1e6:8.1f}µs {stats['iqr'] * 1e6:8.1f}µs  {verdict}")
+        if save:
+            history.append(name, samples)
+    if save:
+        history.save()
+        print(f"saved to {history.path}")
+
+# Explanation:
+# @benchmark registers a function under a dotted name, with an optional setup (start the stub server, create a
+# thread pool or a temporary directory) that runs once, outside the timed region, and a matching teardown.
+# measure() warms up, doubles the number of calls per run until a run lasts at least 10 ms (like timeit.autorange),
+# then times 20 runs and returns the per-call time of each.
+# compare() pools the samples of the last five saved runs as the baseline and flags a regression only when the
+# median is more than THRESHOLD slower AND a Mann-Whitney rank test says the difference is significant (p < 0.01);
+# the pytest gate re-measures once before failing, so a single noisy run doesn't break the build.
+# History keeps the last 50 runs per benchmark with their commit, Python version and machine in .pytest_cache/bench_history.json.
+# Output of `python T_2.py --save` followed by `python T_2.py` (numbers depend on the machine):
+# benchmark                                median        IQR  vs saved runs
+# concurrency.executor_thread_map         286.7µs     14.8µs   -40.5% p=1.000
+# concurrency.range_sum_numpy            4466.8µs    325.5µs   -27.3% p=1.000
+# decorators.memoize_hit                  103.5µs     25.5µs   -38.2% p=1.000
+# decorators.timed_call                    54.4µs      8.6µs   -43.4% p=1.000
+# files.atomic_write                      381.7µs     57.8µs   -22.6% p=0.984
+# files.batched_writer                   6211.2µs   2036.2µs    -1.9% p=0.664
+# http.pooled_get                        1035.8µs     85.3µs   -12.5% p=0.995
+# (A shared single-core sandbox: run-to-run swings of 20-40% are normal there, which is why the threshold is 20%.)
+# Key Points:
+# Save the history on the machine that runs the gate; timings from different machines are not comparable.
+# Benchmark the hot paths users hit, with setup kept outside the timed region.
@@ -0,0 +1,248 @@
+# T_1.py mixes unittest and pytest tests and, at module level, calls faulty_function(1, 0), which stops in
+# pdb.set_trace(): run without a terminal (CI, a cron job, a pre-commit hook) it waits for input forever.
+# A test suite that has grown large also needs to run in parallel:
+# Sharding: collect every test, then split the tests over N worker processes so each one gets about the same
+# amount of work. Durations recorded by earlier runs make the split even (longest tests first, to the least loaded).
+# Fixture caching: each worker is one pytest session, so session-scoped fixtures (a stub HTTP server, a database)
+# are built once per worker instead of once per test.
+# No debugger stops: workers run with PYTHONBREAKPOINT=0, stdin closed and pdb.set_trace replaced by a no-op.
+
+# Example: A parallel, duration-sharded test runner
+# python T_3.py -n 4 path/to/tests   instead of   pytest path/to/tests
+import heapq
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import warnings
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+# Kept under .pytest_cache (gitignored, like pytest's own cache), not next to the sources
+DURATIONS = os.environ.get("TEST_DURATIONS", os.path.join(HERE, ".pytest_cache", "test_durations.json"))
+
+
+def worker_env():
+    env = dict(os.environ, PYTHONBREAKPOINT="0", T3_NON_INTERACTIVE="1")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [HERE, env.get("PYTHONPATH")]))  # So `-p T_3` finds this file
+    return env
+
+
+def collect(args):
+    """(pytest's exit code, {node id: absolute test id} for every test pytest would run for `args`).
+
+    Node ids are relative to pytest's rootdir, which depends on the arguments; the absolute ids work from anywhere.
+    A collection error (a syntax error, a bad import) prints pytest's output and returns no tests: running the
+    tests that did collect would report a green run that silently skipped a file.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".json") as f:
+        result = subprocess.run([sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "T_3", *args],
+                                env=dict(worker_env(), T3_COLLECT=f.name), stdin=subprocess.DEVNULL,
+                                capture_output=True, text=True)
+        if result.returncode not in (pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED):
+            print(result.stdout + result.stderr)
+            return result.returncode, {}
+        try:
+            return result.returncode, json.load(f)
+        except json.JSONDecodeError:
+            return result.returncode, {}
+
+
+def load_durations(path=DURATIONS):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def shard(nodeids, workers, durations):
+    """Split tests into `workers` shards of about equal total duration (longest-processing-time-first).
+
+    Tests without history count as the median known duration (1 s when nothing is known).
+    """
+    known = [durations[nodeid] for nodeid in nodeids if nodeid in durations]
+    default = statistics.median(known) if known else 1.0
+    shards = [[] for _ in range(workers)]
+    loads = [(0.0, index) for index in range(workers)]  # Heap of (total duration, shard index)
+    for nodeid in sorted(nodeids, key=lambda nodeid: -durations.get(nodeid, default)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(nodeid)
+        heapq.heappush(loads, (load + durations.get(nodeid, default), index))
+    return [tests for tests in shards if tests]
+
+
+def run(args, workers=os.cpu_count(), durations_path=DURATIONS, verbose=True):
+    """Run the tests selected by pytest `args` over `workers` processes. Returns pytest's exit code."""
+    code, nodeids = collect(args)
+    if code != pytest.ExitCode.OK:
+        return code
+    if not nodeids:
+        return pytest.ExitCode.NO_TESTS_COLLECTED
+    durations = load_durations(durations_path)
+    workdir = tempfile.mkdtemp(prefix="t3-")
+    processes = []
+    exit_code = pytest.ExitCode.OK
+    try:
+        for index, tests in enumerate(shard(nodeids, workers, durations)):
+            args_file = os.path.join(workdir, f"shard-{index}.args")
+            with open(args_file, "w") as f:  # An @file, not the command line: thousands of test ids don't fit there
+                f.write("\n".join(nodeids[nodeid] for nodeid in tests))
+            report = os.path.join(workdir, f"shard-{index}.json")
+            log = open(os.path.join(workdir, f"shard-{index}.log"), "w+")
+            processes.append([None, report, log, len(tests)])
+            command = [sys.executable, "-m", "pytest", "-q", "-p", "T_3", f"@{args_file}"]
+            processes[-1][0] = subprocess.Popen(command, env=dict(worker_env(), T3_REPORT=report),
+                                                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+        for index, (process, report, log, count) in enumerate(processes):
+            code = process.wait()
+            log.seek(0)
+            output = log.read()
+            try:
+                code = pytest.ExitCode(code)
+            except ValueError:  # Killed by a signal (negative: segfault, OOM killer) or not a pytest exit code
+                output += f"\nworker {index} exited with code {code}: its tests did not finish"
+                code = pytest.ExitCode.INTERNAL_ERROR
+            if code not in (pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED):
+                exit_code = max(exit_code, code)
+                print(output)
+            elif verbose:
+                print(f"worker {index}: {count:4} tests  {output.strip().splitlines()[-1]}")
+            if os.path.exists(report):
+                with open(report) as f:
+                    durations.update(json.load(f))
+    finally:
+        for process, _, log, _ in processes:
+            if process is not None and process.poll() is None:  # Only after an error: don't leave workers behind
+                process.kill()
+                process.wait()
+            log.close()
+        shutil.rmtree(workdir)
+    os.makedirs(os.path.dirname(os.path.abspath(durations_path)), exist_ok=True)
+    with open(durations_path, "w") as f:
+        json.dump(durations, f, indent=1, sort_keys=True)
+    return exit_code
+
+
+# pytest plugin, loaded in every worker with `-p T_3`
+_durations = {}
+
+
+@pytest.hookimpl(trylast=True)  # After pytest's own debugging plugin has installed its pdb.set_trace
+def pytest_configure(config):
+    if os.environ.get("T3_NON_INTERACTIVE") or not sys.stdin.isatty():
+        import pdb
+
+        def set_trace(*args, **kwargs):
+            warnings.warn("pdb.set_trace() ignored: no terminal to debug in", RuntimeWarning, stacklevel=2)
+        pdb.set_trace = set_trace
+        sys.breakpointhook = lambda *args, **kwargs: None
+
+
+def pytest_collection_finish(session):
+    path = os.environ.get("T3_COLLECT")
+    if path:
+        with open(path, "w") as f:
+            json.dump({item.nodeid: f"{session.config.rootpath / item.nodeid}" for item in session.items}, f)
+
+
+def pytest_runtest_logreport(report):
+    _durations[report.nodeid] = _durations.get(report.nodeid, 0.0) + report.duration  # setup + call + teardown
+
+
+def pytest_sessionfinish(session):
+    path = os.environ.get("T3_REPORT")
+    if path:
+        with open(path, "w") as f:
+            json.dump(_durations, f)
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    """The API_1.py stub HTTP server, started once per worker and shared by every test in it."""
+    sys.path.insert(0, os.path.join(ROOT, "Working with APIs"))
+    from API_1 import start_stub_server
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+# A generated suite for the demo: uneven durations (a few slow tests), a shared fixture and two forgotten breakpoints
+SAMPLE_SUITE = '''
+import pdb
+import time
+
+import pytest
+import requests
+
+DURATIONS = [1.0 if i % 12 == 0 else 0.05 for i in range(48)]
+
+
+@pytest.mark.parametrize("i", range(48))
+def test_api(i, stub_server):
+    time.sleep(DURATIONS[i])  # Waiting on I/O, like most slow tests
+    assert requests.get(stub_server.url + "/data").json() == {"key": "value"}
+
+
+def test_forgotten_breakpoints():
+    pdb.set_trace()
+    breakpoint()
+    assert 1 / 1 == 1
+'''
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        workers = int(sys.argv[sys.argv.index("-n") + 1]) if "-n" in sys.argv else os.cpu_count()
+        args = [arg for i, arg in enumerate(sys.argv[1:], 1) if arg != "-n" and sys.argv[i - 1] != "-n"]
+        sys.exit(run(args, workers))
+
+    suite = tempfile.mkdtemp(prefix="t3-suite-")
+    with open(os.path.join(suite, "test_sample.py"), "w") as f:
+        f.write(textwrap.dedent(SAMPLE_SUITE))
+    durations_path = os.path.join(suite, "durations.json")
+    for label, workers in (("1 worker", 1), ("4 workers, no history", 4), ("4 workers, sharded by history", 4),
+                           ("8 workers, sharded by history", 8)):
+        if "sharded" not in label and os.path.exists(durations_path):
+            os.remove(durations_path)
+        start = time.perf_counter()
+        code = run([suite], workers, durations_path, verbose=False)
+        print(f"{label:<32} {time.perf_counter() - start:6.2f}s  exit code {int(code)}")
+
+    # T_1.py stops in pdb.set_trace() at import time; here it fails fast instead of hanging
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "T_3", os.path.join(HERE, "T_1.py")],
+                            env=worker_env(), stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=60)
+    print(f"T_1.py: {result.stdout.strip().splitlines()[-1]} in {time.perf_counter() - start:.1f}s, no hang")
+    shutil.rmtree(suite)
+
+# Explanation:
+# run() collects the tests once (the plugin writes their ids to a file), splits them into shards with shard(), and
+# starts one `pytest -p T_3 @shard.args` process per shard. Each worker is an ordinary pytest session, so
+# session-scoped fixtures like stub_server are created once per worker and shared by all of its tests.
+# shard() hands out the longest tests first, each to the currently least loaded shard. Without history every test
+# counts the same: in the demo that puts all four 1-second tests on worker 0 (test_api[0], [12], [24] and [36]), which
+# is why "no history" is barely faster than one worker. The durations each worker reports are merged into
+# .pytest_cache/test_durations.json, and the next run balances the shards. If collection fails (a syntax error in one
+# file), run() prints pytest's errors and returns its exit code instead of running the tests that did collect.
+# A worker killed by a signal (a negative exit code) fails the run with INTERNAL_ERROR, since its tests never finished.
+# The plugin's pytest_configure runs after pytest's own debugging plugin and replaces pdb.set_trace with a warning;
+# PYTHONBREAKPOINT=0 turns breakpoint() into a no-op, and stdin is /dev/null, so nothing can wait for input.
+# Output (a single-core sandbox: the tests wait on sleep and HTTP, but starting the workers is CPU work that
+# doesn't overlap; with one core per worker the sharded runs approach total / workers):
+# 1 worker                           7.49s  exit code 0
+# 4 workers, no history              6.33s  exit code 0
+# 4 workers, sharded by history      3.76s  exit code 0
+# 8 workers, sharded by history      4.39s  exit code 0
+# T_1.py: 1 warning, 1 error in 0.13s in 0.3s, no hang
+# Key Points:
+# Balance shards by measured duration, not by test count: one slow test decides when a shard finishes.
+# Keep expensive fixtures session-scoped and side-effect free, so sharing them across tests in a worker is safe.
@@ -0,0 +1,137 @@
+# 5.py sends its requests strictly one after another, so a job that calls hundreds of endpoints takes the sum of all the calls.
+# CP_4.py shows that asyncio.create_task lets coroutines wait at the same time, but only with asyncio.sleep().
+# Here the same idea is applied to real HTTP calls with aiohttp: all requests are in flight together,
+# so the wall time is close to the slowest call instead of the sum of all calls.
+
+# Example: Concurrent API fan-out with asyncio and aiohttp
+import asyncio
+import random
+import time
+
+import aiohttp
+from aiohttp import web
+
+
+class AsyncFanOutClient:
+    """Fan out many REST calls concurrently, with at most `limit` requests in flight."""
+
+    def __init__(self, base_url="", headers=None, timeout=5, limit=100):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers or {}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)  # Per-request timeout, like timeout=5 in 5.py
+        self.limit = limit
+        self.session = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        # One connector means the sockets are pooled and kept alive across all calls
+        connector = aiohttp.TCPConnector(limit=self.limit)
+        self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
+        self.semaphore = asyncio.Semaphore(self.limit)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.session.close()
+
+    def _url(self, path):
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def fetch(self, method, path, **kwargs):
+        """Send one request and return (status, parsed JSON or None); a timeout returns (None, TimeoutError)."""
+        async with self.semaphore:
+            try:
+                async with self.session.request(method, self._url(path), **kwargs) as response:
+                    if response.content_type == "application/json":
+                        return response.status, await response.json()
+                    await response.read()
+                    return response.status, None
+            except asyncio.TimeoutError as exc:
+                return None, exc
+
+    async def gather(self, method, paths, **kwargs):
+        """Results in the same order as `paths`."""
+        return await asyncio.gather(*(self.fetch(method, path, **kwargs) for path in paths))
+
+    async def as_completed(self, method, paths, **kwargs):
+        """Yield (path, result) pairs as soon as each call finishes."""
+        async def tagged(path):
+            return path, await self.fetch(method, path, **kwargs)
+
+        tasks = [asyncio.create_task(tagged(path)) for path in paths]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+# A local asyncio test server: /data/<id>?delay=<seconds> answers after the given delay
+async def handle_data(request):
+    delay = float(request.query.get("delay", 0))
+    await asyncio.sleep(delay)
+    return web.json_response({"id": request.match_info["id"], "delay": delay})
+
+
+async def start_test_server(host="127.0.0.1", port=0):
+    app = web.Application()
+    app.router.add_get("/data/{id}", handle_data)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}"
+
+
+async def main():
+    runner, url = await start_test_server()
+    delays = [round(random.uniform(0.05, 0.5), 3) for _ in range(200)]
+    paths = [f"/data/{i}?delay={delay}" for i, delay in enumerate(delays)]
+
+    async with AsyncFanOutClient(url, timeout=5, limit=100) as client:
+        # Sequential, like 5.py: one await after another
+        start = time.perf_counter()
+        for path in paths[:20]:
+            await client.fetch("GET", path)
+        sequential = time.perf_counter() - start
+        print(f"sequential, 20 calls: {sequential:.2f}s (sum of delays {sum(delays[:20]):.2f}s)")
+
+        # Fan-out, results in submission order
+        start = time.perf_counter()
+        results = await client.gather("GET", paths)
+        elapsed = time.perf_counter() - start
+        print(f"gather, {len(results)} calls:  {elapsed:.2f}s (slowest call {max(delays):.2f}s), "
+              f"{len(results) / elapsed:.0f} req/s")
+
+        # Fan-out, results as they complete
+        async for path, (status, body) in client.as_completed("GET", paths[:5]):
+            print(status, body)
+
+        # Per-request timeout: the slow call fails alone and does not hold up the others
+        async with AsyncFanOutClient(url, timeout=0.2) as strict:
+            results = await strict.gather("GET", ["/data/fast?delay=0.01", "/data/slow?delay=1"])
+            print(results)
+
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+
+# Explanation:
+# AsyncFanOutClient keeps one aiohttp.ClientSession, so connections are pooled just like PooledClient in API_1.py.
+# The semaphore caps how many requests are in flight, which protects both the server and the local file-descriptor limit.
+# gather() keeps the submission order, as_completed() yields each result as soon as it arrives.
+# A call that hits the timeout returns (None, TimeoutError) instead of cancelling its siblings.
+# Output (numbers depend on the machine):
+# sequential, 20 calls: 5.61s (sum of delays 5.58s)
+# gather, 200 calls:  1.02s (slowest call 0.50s), 196 req/s
+# 200 {'id': '2', 'delay': 0.058}
+# ...
+# [(200, {'id': 'fast', 'delay': 0.01}), (None, TimeoutError())]
+# Key Points:
+# Wall time scales with the slowest call (times the number of semaphore "rounds"), not with the sum of all calls.
+# Set `limit` to what the backend can handle; 200 calls with limit=100 run in two overlapping waves.
@@ -0,0 +1,239 @@
+# The GET examples in 5.py (plain, authenticated and timeout-guarded) always hit the network, even for data that rarely changes.
+# HTTP already has the tools to avoid that:
+# Freshness: keep a response for a while (a TTL) and answer from memory without asking the server at all.
+# Revalidation: once the TTL is over, ask "has it changed?" with If-None-Match (ETag) or If-Modified-Since (Last-Modified).
+# The server answers 304 Not Modified with an empty body, and the cached body is served again.
+
+# Example: An LRU response cache with TTL and conditional revalidation
+import hashlib
+import os
+import shelve
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+
+import requests
+
+from API_1 import PooledClient, StubHandler, start_stub_server
+
+
+class CacheEntry:
+    __slots__ = ("body", "headers", "etag", "last_modified", "expires_at")
+
+    def __init__(self, body, headers, ttl):
+        self.body = body  # The parsed response.json() (None for HEAD)
+        self.headers = dict(headers)
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+        self.expires_at = time.time() + ttl  # Wall clock, so the expiry is still valid after a restart
+
+    def refresh(self, headers, ttl):
+        """Apply a 304 Not Modified: the server may send new validators and headers along with it."""
+        self.headers.update(headers)
+        self.etag = headers.get("ETag", self.etag)
+        self.last_modified = headers.get("Last-Modified", self.last_modified)
+        self.expires_at = time.time() + ttl
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class ResponseCache:
+    """In-memory LRU of parsed responses, optionally mirrored to an on-disk shelve file."""
+
+    def __init__(self, maxsize=256, ttl=60, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._store = shelve.open(path) if path else None
+        self.stats = {"hits": 0, "misses": 0, "revalidations": 0, "evictions": 0}
+        if self._store is not None:
+            for key in list(self._store):
+                self._remember(key, self._store[key])
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)  # Most recently used goes to the end
+        return entry
+
+    def set(self, key, entry):
+        self._remember(key, entry)
+        if self._store is not None:
+            self._store[key] = entry
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            old_key, _ = self._entries.popitem(last=False)  # Least recently used is at the front
+            self.stats["evictions"] += 1
+            if self._store is not None and old_key in self._store:
+                del self._store[old_key]
+
+    def clear(self):
+        self._entries.clear()
+        if self._store is not None:
+            self._store.clear()
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CachedClient:
+    """Put a ResponseCache in front of the GET and HEAD paths of a PooledClient."""
+
+    def __init__(self, client, cache=None):
+        self.client = client
+        self.cache = cache if cache is not None else ResponseCache()
+
+    # Request arguments that are part of the key (params) or can't change the response (timeout); any other
+    # argument (data, cookies, allow_redirects, ...) sends the request uncached
+    KEYED_ARGUMENTS = {"params", "timeout"}
+
+    def _key(self, method, path, headers, params=None):
+        # Different credentials may see different data, so the Authorization header is part of the key
+        auth = (headers or {}).get("Authorization") or self.client.session.headers.get("Authorization", "")
+        digest = hashlib.sha1(auth.encode()).hexdigest()[:12] if auth else "-"
+        # The URL as it is sent, query string included: ?page=1 and ?page=2 are different entries
+        url = requests.Request(method, self.client._url(path), params=params).prepare().url
+        return f"{method} {url} {digest}"
+
+    def _fetch(self, method, path, headers=None, **kwargs):
+        if not self.KEYED_ARGUMENTS.issuperset(kwargs):
+            response = self.client.request(method, path, headers=headers, **kwargs)
+            response.raise_for_status()
+            body = response.json() if method == "GET" and response.content else None
+            return CacheEntry(body, response.headers, 0)
+        key = self._key(method, path, headers, kwargs.get("params"))
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh:
+            self.cache.stats["hits"] += 1
+            return entry
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+
+        response = self.client.request(method, path, headers=request_headers, **kwargs)
+        if response.status_code == 304:
+            if entry is None:  # The caller sent its own validators: there is no body to serve or to cache
+                return CacheEntry(None, response.headers, 0)
+            self.cache.stats["revalidations"] += 1
+            entry.refresh(response.headers, self.cache.ttl)
+            self.cache.set(key, entry)
+            return entry
+
+        self.cache.stats["misses"] += 1
+        response.raise_for_status()
+        body = response.json() if method == "GET" and response.content else None
+        entry = CacheEntry(body, response.headers, self.cache.ttl)
+        self.cache.set(key, entry)
+        return entry
+
+    def get(self, path, headers=None, **kwargs):
+        """Return the parsed JSON body, from the cache when possible."""
+        return self._fetch("GET", path, headers=headers, **kwargs).body
+
+    def head(self, path, headers=None, **kwargs):
+        """Return the response headers, from the cache when possible."""
+        return self._fetch("HEAD", path, headers=headers, **kwargs).headers
+
+
+# A stub that supports conditional requests and counts how many full bodies it had to send
+class ConditionalStubHandler(StubHandler):
+    etag = '"v1"'
+    last_modified = "Mon, 07 Oct 2024 10:00:00 GMT"
+    full_responses = 0
+
+    def _reply(self, status=200, body=None):
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        type(self).full_responses += 1
+        body = self.body if body is None else body
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.send_header("Last-Modified", self.last_modified)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+if __name__ == "__main__":
+    server = start_stub_server(ConditionalStubHandler)
+    cache_dir = tempfile.mkdtemp()
+    cache_path = os.path.join(cache_dir, "api_cache.db")
+
+    with PooledClient(server.url, headers={"Authorization": "Bearer YOUR_ACCESS_TOKEN"}) as client:
+        cached = CachedClient(client, ResponseCache(maxsize=2, ttl=0.5, path=cache_path))
+
+        print(cached.get("/data"))   # Miss: goes to the server
+        print(cached.get("/data"))   # Hit: served from memory
+        time.sleep(0.6)
+        print(cached.get("/data"))   # Stale: revalidated with If-None-Match, the server answers 304
+        print(cached.head("/data"))  # HEAD responses are cached too
+        cached.get("/data/1")
+        cached.get("/data/2")         # maxsize=2, so the least recently used entry is evicted
+        print(cached.cache.stats)
+        print("full responses sent by the server:", ConditionalStubHandler.full_responses)
+
+        # Read-heavy benchmark
+        start = time.perf_counter()
+        for _ in range(1000):
+            cached.get("/data/2")
+        print(f"cached GET: {1000 / (time.perf_counter() - start):.0f} req/s")
+        start = time.perf_counter()
+        for _ in range(1000):
+            client.get("/data/2").json()
+        print(f"network GET: {1000 / (time.perf_counter() - start):.0f} req/s")
+        cached.cache.close()
+
+    # After a restart the on-disk store refills the memory cache
+    reopened = ResponseCache(path=cache_path)
+    print(len(reopened), "entries survived the restart")
+    reopened.close()
+    shutil.rmtree(cache_dir)
+    server.shutdown()
+
+# Explanation:
+# ResponseCache keeps entries in an OrderedDict: a lookup moves the key to the end, so the front is always the least recently used
+# entry and eviction is a single popitem(last=False).
+# CachedClient answers fresh entries from memory. A stale entry is revalidated: the request carries If-None-Match/If-Modified-Since,
+# and a 304 reuses the cached body and restarts its TTL without transferring or parsing the body again; any new ETag,
+# Last-Modified or other headers sent with the 304 replace the stored ones. A 304 for a key with no entry (the caller
+# sent its own If-None-Match) is returned without a body and never cached.
+# The key is the method, the URL as requests prepares it (with params= in the query string) and a digest of the
+# Authorization header. Requests with arguments the key doesn't cover (data=, cookies=, ...) bypass the cache.
+# With path=..., every entry is written through to a shelve file, and a new ResponseCache loads it back on start-up.
+# Output:
+# {'key': 'value'}
+# {'key': 'value'}
+# {'key': 'value'}
+# {'Server': '...', 'Content-Type': 'application/json', 'ETag': '"v1"', ...}
+# {'hits': 1, 'misses': 4, 'revalidations': 1, 'evictions': 2}
+# full responses sent by the server: 4
+# Key Points:
+# Size the cache with the counters: many evictions and few hits means maxsize is too small for the working set.
+# Only successful responses are stored; errors are raised by raise_for_status() and never cached.
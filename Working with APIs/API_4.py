@@ -0,0 +1,283 @@
+# 5.py only catches requests.exceptions.Timeout and prints a message.
+# In production, transient 5xx/429 responses and timeouts are common, and the naive fix (retry immediately, in a loop)
+# makes things worse: when a backend slows down every caller retries at once and the extra load keeps it down.
+# A retry policy has to be polite:
+# Exponential backoff with jitter: wait longer after each failure, with a random spread so callers don't retry in lock-step.
+# Retry-After: when the server says how long to wait (429/503), wait that long.
+# Retry budget: retries may only add a small fraction of extra load on top of the normal traffic.
+# Circuit breaker: after repeated failures stop calling the host at all for a while and fail fast instead.
+
+# Example: A retry, backoff and circuit-breaker policy engine
+import functools
+import random
+import statistics
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+from API_1 import PooledClient, StubHandler, start_stub_server
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_EXCEPTIONS = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+# Methods that are safe to send twice (urllib3's Retry.DEFAULT_ALLOWED_METHODS): a POST that timed out may already
+# have been applied by the server, and retrying it would apply it again
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the backend while its circuit is open."""
+
+
+class RetryBudget:
+    """Allow at most `ratio` retries per request on average, plus `min_retries` to get started."""
+
+    def __init__(self, ratio=0.2, min_retries=10):
+        self.ratio = ratio
+        self.tokens = float(min_retries)
+        self.max_tokens = float(min_retries)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """closed -> (failure_threshold failures) -> open -> (reset_timeout) -> half-open -> closed or open again."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=10):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError("circuit is open")
+                self.state = "half-open"  # Let one trial call through
+            elif self.state == "half-open":
+                raise CircuitOpenError("circuit is half-open, trial call in progress")
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def release(self):
+        """End a half-open trial that neither succeeded nor failed (the caller gave up): the next call tries again."""
+        with self._lock:
+            if self.state == "half-open":
+                self.state = "open"  # opened_at is already past reset_timeout, so the next call is the new trial
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+def retry_after_seconds(response):
+    """Read Retry-After as seconds or as an HTTP date, None when missing or unreadable."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def host_key(url_or_host):
+    """The key breakers are stored under: the host:port of a URL, or the value itself when it is not a URL."""
+    return urlsplit(url_or_host).netloc or url_or_host
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=4, base_delay=0.1, max_delay=5.0, statuses=RETRY_STATUSES,
+                 budget=None, failure_threshold=5, reset_timeout=10):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = statuses
+        self.budget = budget if budget is not None else RetryBudget()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}  # One circuit breaker per host
+        self._lock = threading.Lock()
+
+    def breaker(self, host):
+        host = host_key(host)
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+    def backoff(self, attempt, response=None):
+        # Retry-After wins; otherwise "full jitter": a random delay between 0 and the exponential cap
+        server_delay = retry_after_seconds(response)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, func, *args, host, attempts=None, **kwargs):
+        """Call func(*args, **kwargs), retrying transient failures; func returns a requests.Response.
+
+        host: the URL or host:port whose breaker guards the call. attempts: overrides max_attempts (1: no retries).
+        """
+        breaker = self.breaker(host)
+        max_attempts = self.max_attempts if attempts is None else attempts
+        self.budget.deposit()
+        for attempt in range(max_attempts):
+            breaker.before_call()
+            response = None
+            try:
+                response = func(*args, **kwargs)
+            except RETRY_EXCEPTIONS:
+                breaker.record_failure()
+                if attempt == max_attempts - 1 or not self.budget.withdraw():
+                    raise
+            except requests.RequestException:
+                breaker.record_failure()  # The host misbehaved, but in a way a retry won't fix
+                raise
+            except BaseException:
+                # KeyboardInterrupt, cancellation or a bug in the caller says nothing about the host, but a half-open
+                # trial must still end, or the breaker sticks
+                breaker.release()
+                raise
+            else:
+                if response.status_code not in self.statuses:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if attempt == max_attempts - 1 or not self.budget.withdraw():
+                    return response  # Out of attempts or budget: hand back the last error response
+            time.sleep(self.backoff(attempt, response))
+
+
+# Used as a decorator, in the style of decorator_func in 4.py
+def retry(policy=None, *, host):  # No default host: one shared breaker would trip for every host at once
+    policy = policy if policy is not None else RetryPolicy()
+
+    def decorator_func(original_func):
+        @functools.wraps(original_func)
+        def wrapper_func(*args, **kwargs):
+            return policy.call(original_func, *args, host=host, **kwargs)
+        return wrapper_func
+    return decorator_func
+
+
+# ... and on the pooled client from API_1.py
+class ResilientClient(PooledClient):
+    """A PooledClient whose requests go through a RetryPolicy. Only `retry_methods` are retried; the others still
+    go through the circuit breaker but are sent once."""
+
+    def __init__(self, base_url="", policy=None, retry_methods=IDEMPOTENT_METHODS, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.policy = policy if policy is not None else RetryPolicy()
+        self.retry_methods = retry_methods
+
+    def request(self, method, path, **kwargs):
+        url = self._url(path)
+        attempts = None if method.upper() in self.retry_methods else 1
+        return self.policy.call(super().request, method, url, host=url, attempts=attempts, **kwargs)
+
+
+# A flaky stub: fails `failure_rate` of the requests with 503 (some with Retry-After) and can be switched off entirely
+class FlakyStubHandler(StubHandler):
+    failure_rate = 0.2
+    down = False
+
+    def do_GET(self):
+        if self.down or random.random() < self.failure_rate:
+            body = b'{"error": "unavailable"}'
+            self.send_response(503)
+            if random.random() < 0.5:
+                self.send_header("Retry-After", "0.05")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        time.sleep(0.002)  # A little service time
+        self._reply()
+
+
+def percentile(samples, p):
+    return statistics.quantiles(samples, n=100)[p - 1]
+
+
+def measure(label, call, n=300):
+    latencies, errors = [], 0
+    for _ in range(n):
+        start = time.perf_counter()
+        try:
+            if call().status_code != 200:
+                errors += 1
+        except (CircuitOpenError, *RETRY_EXCEPTIONS):
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<22} p50 {percentile(latencies, 50):6.1f} ms  p99 {percentile(latencies, 99):6.1f} ms  "
+          f"errors {errors}/{n}")
+
+
+if __name__ == "__main__":
+    server = start_stub_server(FlakyStubHandler)
+
+    @retry(RetryPolicy(max_attempts=4, base_delay=0.01), host=server.url)
+    def get_data():
+        return requests.get(f"{server.url}/data", timeout=5)
+
+    print(get_data().status_code)
+
+    with PooledClient(server.url) as plain, ResilientClient(server.url, RetryPolicy(base_delay=0.01)) as resilient:
+        # Tail latency with 20% transient failures
+        measure("no retries", lambda: plain.get("/data"))
+        measure("retry + backoff", lambda: resilient.get("/data"))
+
+        # Backend down: the breaker opens after a few failures and later calls fail fast
+        FlakyStubHandler.down = True
+        measure("backend down, retry", lambda: resilient.get("/data"), n=50)
+        print("breaker state:", resilient.policy.breaker(server.url).state)
+        FlakyStubHandler.down = False
+
+    server.shutdown()
+
+# Explanation:
+# RetryPolicy.call() is the engine: it asks the host's CircuitBreaker for permission, runs the call, and on a retryable
+# status (429/5xx) or exception waits backoff(attempt) before trying again.
+# backoff() uses Retry-After when the server sends it and "full jitter" otherwise: random.uniform(0, base * 2**attempt).
+# RetryBudget deposits `ratio` tokens per request and every retry costs a whole token, so retries can't exceed ~20% extra load.
+# The same policy is used by the @retry decorator (shaped like decorator_func in 4.py) and by ResilientClient; both
+# key the breakers by host:port (host_key()), so a decorated function and a client calling the same host share one.
+# Other requests exceptions are re-raised at once and count as failures. Anything else (KeyboardInterrupt, a TypeError
+# from bad arguments) is re-raised without counting; breaker.release() still ends a half-open trial.
+# @retry needs an explicit host, and ResilientClient retries only idempotent methods (GET, PUT, DELETE, ...): a POST
+# that timed out may have been applied already, so it is sent once.
+# Output (numbers depend on the machine):
+# 200
+# no retries             p50    3.1 ms  p99    4.9 ms  errors 61/300
+# retry + backoff        p50    3.2 ms  p99   55.2 ms  errors 7/300
+# backend down, retry    p50    0.0 ms  p99   60.3 ms  errors 50/50
+# breaker state: open
+# Key Points:
+# Retries turn most transient errors into successes at the cost of a longer tail; the budget keeps that cost bounded.
+# While the breaker is open, calls raise CircuitOpenError immediately instead of waiting on a dead backend.
@@ -0,0 +1,251 @@
+# The POST, PUT and PATCH examples in 5.py send one tiny JSON document per request ({'key': 'value'}).
+# At millions of updates a day, almost all of the time goes into per-request overhead (headers, round trips, server dispatch),
+# not into the data itself. Two techniques cut the number of requests:
+# Batching: buffer outgoing writes and send many of them in one request, flushing when the buffer is full or a time window ends.
+# Coalescing: several PATCHes to the same resource (e.g. /data/1) waiting in the buffer can be merged into one.
+# Every caller still gets its own result through a concurrent.futures.Future.
+
+# Example: Bulk request batching and write coalescing
+import itertools
+import json
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future, InvalidStateError, wait
+
+from API_1 import PooledClient, StubHandler, start_stub_server
+
+
+class _PendingWrite:
+    __slots__ = ("method", "path", "body", "futures")
+
+    def __init__(self, method, path, body, future):
+        self.method = method
+        self.path = path
+        self.body = body
+        self.futures = [future]
+
+
+def _settle(future, result=None, exception=None):
+    """Complete a caller's Future, unless the caller has cancelled it (set_result would raise InvalidStateError)."""
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class WriteBatcher:
+    """Buffer POST/PUT/PATCH/DELETE calls and send them as batches to `batch_path`.
+
+    Writes to the same resource always go through the same lane, and each lane sends its batches one after another,
+    so per-resource ordering is preserved while the lanes run concurrently.
+    """
+
+    def __init__(self, client, batch_path="/batch", max_batch=100, max_delay=0.05, lanes=4):
+        self.client = client
+        self.batch_path = batch_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = {"submitted": 0, "coalesced": 0, "batches": 0}
+        self._pending = {}  # Insertion ordered: resource path (or a unique key for POST) -> _PendingWrite
+        self._first_at = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._unique = itertools.count()
+        self._lanes = [queue.Queue() for _ in range(lanes)]
+        self._threads = [threading.Thread(target=self._send_loop, args=(q,), daemon=True) for q in self._lanes]
+        self._threads.append(threading.Thread(target=self._flush_loop, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, method, path, json=None):
+        """Queue one write and return a Future for its {"status": ..., "body": ...} result."""
+        method = method.upper()
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("batcher is closed")
+            self.stats["submitted"] += 1
+            key = ("POST", next(self._unique)) if method == "POST" else path  # POSTs create, never merge them
+            pending = self._pending.get(key)
+            if pending is not None and method == "PATCH" and pending.method in ("PATCH", "PUT"):
+                pending.body = {**(pending.body or {}), **(json or {})}  # Later fields win, like applying both PATCHes in order
+                pending.futures.append(future)
+                self.stats["coalesced"] += 1
+            elif pending is not None and method in ("PUT", "DELETE"):
+                pending.method, pending.body = method, json  # A full replace or delete supersedes earlier writes
+                pending.futures.append(future)
+                self.stats["coalesced"] += 1
+            else:
+                if pending is not None:
+                    self._flush_locked()  # e.g. PATCH after DELETE: can't merge, so send the earlier write first
+                self._pending[key] = _PendingWrite(method, path, json, future)
+                if self._first_at is None:
+                    self._first_at = time.monotonic()
+                if len(self._pending) >= self.max_batch:
+                    self._flush_locked()
+            self._cond.notify()
+        return future
+
+    def post(self, path, json=None):
+        return self.submit("POST", path, json)
+
+    def put(self, path, json=None):
+        return self.submit("PUT", path, json)
+
+    def patch(self, path, json=None):
+        return self.submit("PATCH", path, json)
+
+    def delete(self, path):
+        return self.submit("DELETE", path)
+
+    def flush(self):
+        with self._cond:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        batches = [[] for _ in self._lanes]
+        for write in self._pending.values():
+            batches[zlib.crc32(write.path.encode()) % len(self._lanes)].append(write)
+        self._pending = {}
+        self._first_at = None
+        for lane, batch in zip(self._lanes, batches):
+            if batch:
+                lane.put(batch)
+
+    def _flush_loop(self):
+        # Time-based flush: nothing waits in the buffer for longer than max_delay
+        with self._cond:
+            while not self._closed:
+                if self._first_at is None:
+                    self._cond.wait()
+                    continue
+                remaining = self._first_at + self.max_delay - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                else:
+                    self._flush_locked()
+
+    def _send_loop(self, lane):
+        while True:
+            batch = lane.get()
+            if batch is None:
+                return
+            operations = [{"method": w.method, "path": w.path, "body": w.body} for w in batch]
+            try:
+                response = self.client.post(self.batch_path, json={"operations": operations})
+                response.raise_for_status()
+                results = response.json()["results"]
+                if len(results) != len(batch):
+                    raise ValueError(f"batch of {len(batch)} writes got {len(results)} results")
+            except Exception as exc:
+                for write in batch:
+                    for future in write.futures:
+                        _settle(future, exception=exc)
+                continue
+            with self._cond:
+                self.stats["batches"] += 1
+            for write, result in zip(batch, results):
+                for future in write.futures:
+                    _settle(future, result)
+
+    def close(self):
+        """Flush what is buffered, wait until every batch is sent and stop the threads."""
+        with self._cond:
+            self._flush_locked()
+            self._closed = True
+            self._cond.notify_all()
+        for lane in self._lanes:
+            lane.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# A stub with a /batch endpoint and an in-memory store, counting the HTTP requests it receives
+class BatchStubHandler(StubHandler):
+    store = {}
+    requests_seen = 0
+    lock = threading.Lock()
+
+    def _apply(self, method, path, body):
+        with self.lock:
+            if method == "DELETE":
+                self.store.pop(path, None)
+                return {"status": 204, "body": None}
+            if method == "PATCH":
+                self.store[path] = {**self.store.get(path, {}), **(body or {})}
+            else:
+                self.store[path] = body
+            return {"status": 201 if method == "POST" else 200, "body": self.store[path]}
+
+    def _handle(self):
+        with self.lock:
+            type(self).requests_seen += 1
+        body = json.loads(self._read_body() or b"null")
+        if self.path == "/batch":
+            results = [self._apply(op["method"], op["path"], op["body"]) for op in body["operations"]]
+            return self._reply(200, json.dumps({"results": results}).encode())
+        result = self._apply(self.command, self.path, body)
+        self._reply(result["status"], json.dumps(result["body"]).encode())
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+if __name__ == "__main__":
+    server = start_stub_server(BatchStubHandler)
+    updates = [(f"/data/{i % 200}", {f"field{i % 7}": i}) for i in range(5000)]
+
+    with PooledClient(server.url, pool_maxsize=8) as client:
+        # Coalescing in action
+        with WriteBatcher(client, max_delay=0.05) as batcher:
+            first = batcher.patch("/data/1", {"key": "updated_value"})
+            second = batcher.patch("/data/1", {"other": 1})
+            print(first.result(), second.result())
+
+        # One request per update, like 5.py
+        BatchStubHandler.requests_seen = 0
+        start = time.perf_counter()
+        for path, body in updates:
+            client.patch(path, json=body)
+        elapsed = time.perf_counter() - start
+        print(f"one-by-one: {BatchStubHandler.requests_seen} requests, {len(updates) / elapsed:.0f} updates/s")
+
+        # Batched and coalesced
+        BatchStubHandler.requests_seen = 0
+        start = time.perf_counter()
+        with WriteBatcher(client, max_batch=500, max_delay=0.01, lanes=4) as batcher:
+            futures = [batcher.patch(path, body) for path, body in updates]
+            wait(futures)
+        elapsed = time.perf_counter() - start
+        print(f"batched:    {BatchStubHandler.requests_seen} requests, {len(updates) / elapsed:.0f} updates/s, "
+              f"{batcher.stats}")
+
+    server.shutdown()
+
+# Explanation:
+# submit() puts each write into an insertion-ordered dict keyed by resource path. A PATCH to a path that is already waiting
+# is merged into the waiting body; a PUT or DELETE replaces it. Either way the caller's Future is attached to the merged write.
+# The buffer is flushed when it holds max_batch writes or when the oldest write has waited max_delay seconds.
+# A flush splits the writes into lanes by crc32(path); each lane thread sends its batches in order, so two writes to /data/1
+# are never reordered, while different resources are sent concurrently.
+# Output (numbers depend on the machine):
+# {'status': 200, 'body': {'key': 'updated_value', 'other': 1}} {'status': 200, 'body': {'key': 'updated_value', 'other': 1}}
+# one-by-one: 5000 requests, 1065 updates/s
+# batched:    12 requests, 79496 updates/s, {'submitted': 5000, 'coalesced': 4400, 'batches': 12}
+# Key Points:
+# The request-count reduction is batching (up to max_batch writes per request) times coalescing (hot resources merge).
+# max_delay bounds the extra latency a single write can see; a larger window means bigger batches and more coalescing.
+# A failed batch fails every Future in it, so callers can still retry individually (see API_4.py); so does a reply with the wrong
+# number of results. Futures cancelled by their callers are skipped, so one of them can't stop a lane.
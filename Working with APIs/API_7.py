@@ -0,0 +1,332 @@
+# Every example in 5.py sends its body with json=data and reads it back with response.json(). Both use the stdlib
+# json module, and response.json() first decodes response.content (bytes) into response.text (str), guessing the
+# encoding, before parsing it. For large payloads, turning JSON into Python objects and back is where the CPU goes.
+# A pluggable codec layer:
+# orjson or msgspec when they are installed (both written in C/Rust and several times faster), the stdlib otherwise.
+# Decoding straight from response.content: orjson and msgspec parse the bytes themselves, with no intermediate str
+# (the stdlib fallback still decodes to str inside json.loads, but skips requests' encoding guess).
+# Typed decoding into slotted objects: msgspec builds them while parsing (and validates the types); the other codecs
+# convert the parsed dicts afterwards.
+# Optional gzip/zstd compression of request bodies above a size threshold, for slow or metered links.
+
+# Example: Fast JSON codecs and compressed request bodies
+import dataclasses
+import functools
+import gzip
+import json
+import time
+import typing
+
+from API_1 import PooledClient, StubHandler, start_stub_server
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+@functools.lru_cache(maxsize=None)
+def _converter(tp):
+    """A function building `tp` (a dataclass, or list[...]/dict[str, ...] of them) from parsed JSON; None for plain types.
+
+    Built once per type, so the type hints are not looked up again for every object.
+    """
+    if dataclasses.is_dataclass(tp):
+        fields = {key: convert for key, hint in typing.get_type_hints(tp).items() if (convert := _converter(hint))}
+
+        def build(obj):
+            for key, convert in fields.items():
+                if key in obj:
+                    obj[key] = convert(obj[key])
+            return tp(**obj)  # TypeError on missing or unknown fields
+        return build
+    origin = typing.get_origin(tp)
+    if origin is list:
+        convert = _converter(typing.get_args(tp)[0])
+        return convert and (lambda obj: [convert(item) for item in obj])
+    if origin is dict:
+        convert = _converter(typing.get_args(tp)[1])
+        return convert and (lambda obj: {key: convert(value) for key, value in obj.items()})
+    return None
+
+
+def _convert(obj, tp):
+    convert = _converter(tp)
+    return obj if convert is None else convert(obj)
+
+
+def _builtin(obj):
+    """`default` hook for the stdlib: dataclasses become dicts (orjson and msgspec handle them natively)."""
+    if dataclasses.is_dataclass(obj):
+        return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibCodec:
+    name = "json"
+
+    def encode(self, obj):
+        return json.dumps(obj, separators=(",", ":"), default=_builtin).encode()
+
+    def decode(self, data, type=None):
+        obj = json.loads(data)  # Accepts bytes (UTF-8/16/32), but decodes them to a str internally before parsing
+        return obj if type is None else _convert(obj, type)
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def encode(self, obj):
+        return orjson.dumps(obj)  # Returns bytes, serializes dataclasses natively
+
+    def decode(self, data, type=None):
+        obj = orjson.loads(data)
+        return obj if type is None else _convert(obj, type)
+
+
+class MsgspecCodec:
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoders = {}  # One Decoder per target type, built once
+
+    def encode(self, obj):
+        return self._encoder.encode(obj)
+
+    def decode(self, data, type=None):
+        decoder = self._decoders.get(type)
+        if decoder is None:
+            decoder = self._decoders[type] = msgspec.json.Decoder(type) if type is not None else msgspec.json.Decoder()
+        return decoder.decode(data)  # Typed: objects are built and validated while parsing
+
+
+CODECS = {"msgspec": MsgspecCodec, "orjson": OrjsonCodec, "json": StdlibCodec}
+
+
+def available_codecs():
+    return [name for name, module in (("msgspec", msgspec), ("orjson", orjson), ("json", json)) if module is not None]
+
+
+def get_codec(name=None):
+    """The named codec, or the fastest one installed: msgspec, then orjson, then the stdlib.
+
+    Fails when the codec is selected, not on its first use: ValueError for an unknown name, ImportError for a codec
+    whose package is not installed.
+    """
+    name = name or available_codecs()[0]
+    if name not in CODECS:
+        raise ValueError(f"unknown codec {name!r}, expected one of {sorted(CODECS)}")
+    if name not in available_codecs():
+        raise ImportError(f"the {name} codec needs the {name} package: pip install {name}")
+    return CODECS[name]()
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("zstd Content-Encoding needs the zstandard package: pip install zstandard")
+
+
+def compress(body, encoding, level=None):
+    """Compress a request body for a Content-Encoding of "gzip" or "zstd"."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6 if level is None else level, mtime=0)
+    if encoding == "zstd":
+        _require_zstandard()
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(body)
+    raise ValueError(f"unsupported Content-Encoding {encoding!r}")
+
+
+def decompress(body, encoding):
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "zstd":
+        _require_zstandard()
+        return zstandard.ZstdDecompressor().decompress(body)
+    return body
+
+
+class CodecClient(PooledClient):
+    """A PooledClient whose json= bodies and decode() go through a pluggable codec.
+
+    compress: None, "gzip" or "zstd"; bodies smaller than compress_min bytes are sent uncompressed.
+    """
+
+    def __init__(self, base_url="", codec=None, compress=None, compress_min=1024, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.codec = get_codec(codec) if codec is None or isinstance(codec, str) else codec
+        if compress == "zstd":
+            _require_zstandard()
+        elif compress not in (None, "gzip"):
+            raise ValueError(f"unsupported Content-Encoding {compress!r}")
+        self.compress = compress
+        self.compress_min = compress_min
+
+    def request(self, method, path, json=None, **kwargs):
+        if json is not None:
+            body = self.codec.encode(json)
+            headers = {"Content-Type": "application/json", **(kwargs.pop("headers", None) or {})}
+            if self.compress and len(body) >= self.compress_min:
+                body = compress(body, self.compress)
+                headers["Content-Encoding"] = self.compress
+            kwargs["data"], kwargs["headers"] = body, headers
+        return super().request(method, path, **kwargs)
+
+    def decode(self, response, type=None):
+        """Parse response.content (bytes) with the codec, into `type` if given. Use instead of response.json()."""
+        return self.codec.decode(response.content, type)
+
+    def get_json(self, path, type=None, **kwargs):
+        response = self.get(path, **kwargs)
+        response.raise_for_status()
+        return self.decode(response, type)
+
+
+# Typed records: slotted dataclasses, built directly by msgspec or from the parsed dicts by the other codecs
+@dataclasses.dataclass(slots=True)
+class Tag:
+    name: str
+    weight: float
+
+
+@dataclasses.dataclass(slots=True)
+class Item:
+    id: int
+    name: str
+    price: float
+    in_stock: bool
+    tags: list[Tag]
+    attributes: dict[str, str]
+
+
+def make_items(count):
+    return [{"id": i, "name": f"item-{i:08d}", "price": i * 0.25, "in_stock": i % 3 != 0,
+             "tags": [{"name": f"tag-{j}", "weight": j / 10} for j in range(4)],
+             "attributes": {"color": "red", "size": "XL", "description": "lorem ipsum dolor sit amet " * 3}}
+            for i in range(count)]
+
+
+# Echoes the (decompressed) request body and serves a large JSON document at /items
+class CodecStubHandler(StubHandler):
+    items_body = json.dumps(make_items(5000)).encode()
+
+    def _read_body(self):
+        return decompress(super()._read_body(), self.headers.get("Content-Encoding"))
+
+    def do_GET(self):
+        if self.path == "/items":
+            return self._reply(body=self.items_body)
+        self._reply()
+
+
+def throughput(label, func, size, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<30} {size / best / 2**20:8.0f} MB/s")
+
+
+def request_cpu_ms(send, n=20):
+    """CPU time of the calling thread per request: encoding, sending, receiving and decoding (the server runs in other threads)."""
+    send()
+    start = time.thread_time()
+    for _ in range(n):
+        send()
+    return (time.thread_time() - start) / n * 1e3
+
+
+if __name__ == "__main__":
+    payload = make_items(5000)
+    data = json.dumps(payload).encode()
+    print(f"payload: {len(data) / 2**20:.1f} MB, {len(payload)} items; codecs installed: {available_codecs()}")
+    for name in available_codecs():
+        codec = get_codec(name)
+        print(codec.name)
+        throughput("encode", lambda: codec.encode(payload), len(data))
+        throughput("decode bytes", lambda: codec.decode(data), len(data))
+        throughput("decode bytes into Item", lambda: codec.decode(data, list[Item]), len(data))
+    throughput("json.loads(bytes.decode()) (5.py)", lambda: json.loads(data.decode()), len(data))
+
+    # Typed decoding checks the data against the schema (msgspec) or the fields (the others)
+    item = get_codec().decode(data, list[Item])[0]
+    print(item.tags[0], hasattr(item, "__dict__"))
+    if msgspec is not None:
+        try:
+            get_codec("msgspec").decode(b'[{"id": "1"}]', list[Item])
+        except msgspec.ValidationError as exc:
+            print("ValidationError:", exc)
+
+    # Compression of the request body
+    for encoding in ("gzip", "zstd") if zstandard is not None else ("gzip",):
+        start = time.perf_counter()
+        compressed = compress(data, encoding)
+        print(f"{encoding}: {len(data) / 2**20:.1f} MB -> {len(compressed) / 2**20:.2f} MB "
+              f"in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    # End to end: POST the payload, then GET and decode a document of the same size
+    server = start_stub_server(CodecStubHandler)
+    with PooledClient(server.url) as client:
+        cpu = request_cpu_ms(lambda: client.post("/items", json=payload).json() and client.get("/items").json())
+        print(f"5.py style (json=, response.json())  {cpu:6.1f} ms CPU per POST + GET")
+    setups = [(name, None, None) for name in available_codecs()] + [(get_codec().name, None, list[Item])]
+    setups += [(get_codec().name, encoding, None) for encoding in ("gzip", "zstd") if encoding == "gzip" or zstandard]
+    for name, encoding, type in setups:
+        with CodecClient(server.url, codec=name, compress=encoding) as client:
+            cpu = request_cpu_ms(lambda: client.decode(client.post("/items", json=payload))
+                                 and client.get_json("/items", type))
+            label = f"CodecClient {name}" + (f" + {encoding}" if encoding else "") + (" typed" if type else "")
+            print(f"{label:<36} {cpu:6.1f} ms CPU per POST + GET")
+    server.shutdown()
+
+# Explanation:
+# get_codec() returns the first installed codec (msgspec, orjson, then the stdlib); all three expose encode(obj) -> bytes
+# and decode(bytes, type=None), so CodecClient works the same with any of them.
+# CodecClient.request() encodes json= with the codec and sends the bytes as data=, compressed with gzip or zstd (and a
+# Content-Encoding header) when the body is at least compress_min bytes. decode() parses response.content, the raw
+# bytes, so there is no response.text and no guess at the charset (json.loads on bytes only checks for UTF-8/16/32).
+# With a type such as list[Item], msgspec builds the slotted dataclasses while parsing and raises ValidationError on a
+# mismatch. orjson and the stdlib parse to dicts first; _converter() builds a converter once per type and applies it.
+# Output (a single-core sandbox: the stub server shares the CPU, but only the client thread's CPU time is counted;
+# numbers depend on the machine):
+# payload: 1.7 MB, 5000 items; codecs installed: ['msgspec', 'orjson', 'json']
+# msgspec
+#   encode                              608 MB/s
+#   decode bytes                        137 MB/s
+#   decode bytes into Item              157 MB/s
+# orjson
+#   encode                              526 MB/s
+#   decode bytes                        149 MB/s
+#   decode bytes into Item               53 MB/s
+# json
+#   encode                               70 MB/s
+#   decode bytes                         99 MB/s
+#   decode bytes into Item               52 MB/s
+#   json.loads(bytes.decode()) (5.py)      105 MB/s
+# Tag(name='tag-0', weight=0.0) False
+# ValidationError: Expected `int`, got `str` - at `$[0].id`
+# gzip: 1.7 MB -> 0.05 MB in 10.7 ms
+# zstd: 1.7 MB -> 0.03 MB in 1.2 ms
+# 5.py style (json=, response.json())    77.3 ms CPU per POST + GET
+# CodecClient msgspec                    40.6 ms CPU per POST + GET
+# CodecClient orjson                     39.0 ms CPU per POST + GET
+# CodecClient json                       77.7 ms CPU per POST + GET
+# CodecClient msgspec typed              39.3 ms CPU per POST + GET
+# CodecClient msgspec + gzip             49.9 ms CPU per POST + GET
+# CodecClient msgspec + zstd             38.6 ms CPU per POST + GET
+# Encoding is where the fast codecs win most (8x); decoding gains less because building the Python dicts and strings
+# costs the same for everyone. Typed decoding is free with msgspec, since it builds the objects instead of dicts.
+# The demo payload is very repetitive, so it compresses 35-60x; zstd does it several times faster than gzip.
+# Key Points:
+# Pass response.content to a fast codec instead of calling response.json(); send codec.encode(obj) as data=.
+# Decode into typed, slotted objects at the edge: less memory per record, and bad data fails there, not later.
+# Compress request bodies only when the link is the bottleneck; on loopback it is pure CPU cost (zstd far less than gzip).